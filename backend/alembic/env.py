@@ -10,7 +10,7 @@ from dotenv import load_dotenv
 sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), '..')))
 
 from app.core.database import Base
-from app.models import User, Habit, DailyLog, Todo, HabitCompletion  # Import all models here
+from app.models import User, Habit, DailyLog, Todo, HabitCompletion, UserDirectory, HabitCompletionArchive, DailyLogArchive  # Import all models here
 from app.core.config import settings
 
 # this is the Alembic Config object, which provides
@@ -22,8 +22,16 @@ config = context.config
 if config.config_file_name is not None:
     fileConfig(config.config_file_name)
 
-# Set the sqlalchemy.url from the settings
-config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
+# Set the sqlalchemy.url from the settings. Each shard carries the same schema and
+# is migrated separately: pass `-x shard=N` on the command line, or set
+# config.attributes["shard"] when invoking Alembic programmatically.
+shard = config.attributes.get("shard", context.get_x_argument(as_dictionary=True).get("shard"))
+# Migrations read this to tell the directory run (None) from shard runs
+config.attributes["shard"] = shard
+if shard is None:
+    config.set_main_option("sqlalchemy.url", settings.DATABASE_URL)
+else:
+    config.set_main_option("sqlalchemy.url", settings.shard_urls[int(shard)])
 
 target_metadata = Base.metadata
 
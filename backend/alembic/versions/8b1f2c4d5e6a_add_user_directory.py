@@ -0,0 +1,47 @@
+"""add user directory for sharding
+
+Revision ID: 8b1f2c4d5e6a
+Revises: 313686c86791
+Create Date: 2026-10-19 09:12:40.318204
+
+"""
+from alembic import context, op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8b1f2c4d5e6a'
+down_revision = '313686c86791'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table('user_directory',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('email', sa.String(), nullable=False),
+    sa.Column('shard_id', sa.Integer(), nullable=False, server_default='0'),
+    sa.Column('is_moving', sa.Boolean(), nullable=False, server_default=sa.false()),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(op.f('ix_user_directory_email'), 'user_directory', ['email'], unique=True)
+    op.create_index(op.f('ix_user_directory_id'), 'user_directory', ['id'], unique=False)
+
+    # Every database gets the table so schemas stay identical, but only the
+    # directory database (migrated without a shard argument) holds entries
+    if context.config.attributes.get("shard") is not None:
+        return
+
+    # Existing users all live on the original database, which becomes shard 0
+    op.execute("INSERT INTO user_directory (id, email, shard_id, is_moving) SELECT id, email, 0, false FROM users")
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute(
+            "SELECT setval(pg_get_serial_sequence('user_directory', 'id'), "
+            "COALESCE((SELECT MAX(id) FROM user_directory), 0) + 1, false)"
+        )
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_user_directory_id'), table_name='user_directory')
+    op.drop_index(op.f('ix_user_directory_email'), table_name='user_directory')
+    op.drop_table('user_directory')
@@ -0,0 +1,162 @@
+"""partition completions and logs by month, add archive tables
+
+Revision ID: a41c7e9f3b20
+Revises: 8b1f2c4d5e6a
+Create Date: 2026-10-19 11:03:52.640117
+
+"""
+from datetime import date
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'a41c7e9f3b20'
+down_revision = '8b1f2c4d5e6a'
+branch_labels = None
+depends_on = None
+
+# table -> (partition key, column DDL without the id column)
+PARTITIONED = {
+    'habit_completions': ('completed_at', [
+        'habit_id INTEGER REFERENCES habits (id)',
+        'completed_at TIMESTAMP WITHOUT TIME ZONE NOT NULL',
+    ]),
+    'daily_logs': ('date', [
+        'user_id INTEGER REFERENCES users (id)',
+        'date TIMESTAMP WITHOUT TIME ZONE NOT NULL',
+        'content VARCHAR',
+        'mood VARCHAR',
+    ]),
+}
+
+COMPOSITE_INDEXES = {
+    'habit_completions': ('ix_habit_completions_habit_id_completed_at', ['habit_id', 'completed_at']),
+    'daily_logs': ('ix_daily_logs_user_id_date', ['user_id', 'date']),
+}
+
+MONTHS_AHEAD = 3
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _partition(table: str, month: date) -> None:
+    op.execute(
+        f"CREATE TABLE IF NOT EXISTS {table}_p{month:%Y_%m} PARTITION OF {table} "
+        f"FOR VALUES FROM ('{month.isoformat()}') TO ('{_next_month(month).isoformat()}')"
+    )
+
+
+def _partition_table(bind, table: str) -> None:
+    key, columns = PARTITIONED[table]
+    old = f'{table}_unpartitioned'
+    seq = bind.execute(sa.text(f"SELECT pg_get_serial_sequence('{table}', 'id')")).scalar()
+
+    # Keep the id sequence alive across the swap
+    op.execute(f'ALTER SEQUENCE {seq} OWNED BY NONE')
+    op.execute(f'ALTER TABLE {table} RENAME TO {old}')
+    op.execute(f'ALTER TABLE {old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey')
+    op.execute(f'ALTER INDEX ix_{table}_id RENAME TO ix_{old}_id')
+
+    column_ddl = ',\n    '.join([f"id INTEGER NOT NULL DEFAULT nextval('{seq}')"] + columns)
+    op.execute(
+        f'CREATE TABLE {table} (\n    {column_ddl},\n    PRIMARY KEY (id, {key})\n) '
+        f'PARTITION BY RANGE ({key})'
+    )
+    op.execute(f'ALTER SEQUENCE {seq} OWNED BY {table}.id')
+    op.create_index(op.f(f'ix_{table}_id'), table, ['id'], unique=False)
+    index_name, index_columns = COMPOSITE_INDEXES[table]
+    op.create_index(index_name, table, index_columns, unique=False)
+
+    op.execute(f'CREATE TABLE {table}_default PARTITION OF {table} DEFAULT')
+    first = bind.execute(sa.text(f'SELECT MIN({key}) FROM {old}')).scalar() or date.today()
+    month = date(first.year, first.month, 1)
+    today = date.today()
+    last = date(today.year, today.month, 1)
+    for _ in range(MONTHS_AHEAD):
+        last = _next_month(last)
+    while month <= last:
+        _partition(table, month)
+        month = _next_month(month)
+
+    column_names = ['id'] + [c.split()[0] for c in columns]
+    names = ', '.join(column_names)
+    select = ', '.join(f'COALESCE({n}, NOW())' if n == key else n for n in column_names)
+    op.execute(f'INSERT INTO {table} ({names}) SELECT {select} FROM {old}')
+    op.execute(f'DROP TABLE {old}')
+
+
+def _unpartition_table(bind, table: str) -> None:
+    key, columns = PARTITIONED[table]
+    old = f'{table}_partitioned'
+    seq = bind.execute(sa.text(f"SELECT pg_get_serial_sequence('{table}', 'id')")).scalar()
+
+    op.execute(f'ALTER SEQUENCE {seq} OWNED BY NONE')
+    op.execute(f'ALTER TABLE {table} RENAME TO {old}')
+    op.execute(f'ALTER INDEX ix_{table}_id RENAME TO ix_{old}_id')
+    op.execute(f'ALTER INDEX {COMPOSITE_INDEXES[table][0]} RENAME TO {COMPOSITE_INDEXES[table][0]}_old')
+    op.execute(f'ALTER TABLE {old} RENAME CONSTRAINT {table}_pkey TO {old}_pkey')
+
+    column_ddl = ',\n    '.join([f"id INTEGER NOT NULL DEFAULT nextval('{seq}') PRIMARY KEY"] + columns)
+    op.execute(f'CREATE TABLE {table} (\n    {column_ddl}\n)')
+    op.execute(f'ALTER TABLE {table} ALTER COLUMN {key} DROP NOT NULL')
+    op.execute(f'ALTER SEQUENCE {seq} OWNED BY {table}.id')
+    op.create_index(op.f(f'ix_{table}_id'), table, ['id'], unique=False)
+
+    names = ', '.join(['id'] + [c.split()[0] for c in columns])
+    op.execute(f'INSERT INTO {table} ({names}) SELECT {names} FROM {old}')
+    op.execute(f'DROP TABLE {old} CASCADE')
+
+
+def upgrade() -> None:
+    op.create_table('habit_completion_archives',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('payload', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'month')
+    )
+    op.create_index(op.f('ix_habit_completion_archives_id'), 'habit_completion_archives', ['id'], unique=False)
+    op.create_index(op.f('ix_habit_completion_archives_user_id'), 'habit_completion_archives', ['user_id'], unique=False)
+    op.create_table('daily_log_archives',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('month', sa.Date(), nullable=False),
+    sa.Column('payload', sa.LargeBinary(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('user_id', 'month')
+    )
+    op.create_index(op.f('ix_daily_log_archives_id'), 'daily_log_archives', ['id'], unique=False)
+    op.create_index(op.f('ix_daily_log_archives_user_id'), 'daily_log_archives', ['user_id'], unique=False)
+
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        # Range partitioning is Postgres-only; elsewhere just add the lookup indexes
+        op.create_index('ix_habit_completions_habit_id_completed_at', 'habit_completions', ['habit_id', 'completed_at'], unique=False)
+        op.create_index('ix_daily_logs_user_id_date', 'daily_logs', ['user_id', 'date'], unique=False)
+        return
+    for table in PARTITIONED:
+        _partition_table(bind, table)
+
+
+def downgrade() -> None:
+    # Months already compacted into the archive tables are not restored
+    bind = op.get_bind()
+    if bind.dialect.name != 'postgresql':
+        op.drop_index('ix_daily_logs_user_id_date', table_name='daily_logs')
+        op.drop_index('ix_habit_completions_habit_id_completed_at', table_name='habit_completions')
+    else:
+        for table in PARTITIONED:
+            _unpartition_table(bind, table)
+
+    op.drop_index(op.f('ix_daily_log_archives_user_id'), table_name='daily_log_archives')
+    op.drop_index(op.f('ix_daily_log_archives_id'), table_name='daily_log_archives')
+    op.drop_table('daily_log_archives')
+    op.drop_index(op.f('ix_habit_completion_archives_user_id'), table_name='habit_completion_archives')
+    op.drop_index(op.f('ix_habit_completion_archives_id'), table_name='habit_completion_archives')
+    op.drop_table('habit_completion_archives')
@@ -0,0 +1,46 @@
+"""add todo filter indexes
+
+Revision ID: c7d9e1a2b384
+Revises: a41c7e9f3b20
+Create Date: 2026-10-19 15:27:06.118452
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c7d9e1a2b384'
+down_revision = 'a41c7e9f3b20'
+branch_labels = None
+depends_on = None
+
+
+# column -> value that NULLs (rows older than the column defaults) are backfilled with
+DEFAULTS = {'status': 'todo', 'priority': 'medium', 'is_completed': False}
+
+
+def upgrade() -> None:
+    # The filters compare the raw columns so the indexes below stay usable;
+    # that requires every row to carry a value
+    todos = sa.table('todos', *(sa.column(name) for name in DEFAULTS))
+    for name, value in DEFAULTS.items():
+        op.execute(todos.update().where(todos.c[name].is_(None)).values({name: value}))
+    with op.batch_alter_table('todos') as batch_op:
+        batch_op.alter_column('status', existing_type=sa.String(), nullable=False)
+        batch_op.alter_column('priority', existing_type=sa.String(), nullable=False)
+        batch_op.alter_column('is_completed', existing_type=sa.Boolean(), nullable=False)
+
+    op.create_index('ix_todos_user_id_status', 'todos', ['user_id', 'status'], unique=False)
+    op.create_index('ix_todos_user_id_priority', 'todos', ['user_id', 'priority'], unique=False)
+    op.create_index('ix_todos_user_id_due_date', 'todos', ['user_id', 'due_date'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_todos_user_id_due_date', table_name='todos')
+    op.drop_index('ix_todos_user_id_priority', table_name='todos')
+    op.drop_index('ix_todos_user_id_status', table_name='todos')
+    with op.batch_alter_table('todos') as batch_op:
+        batch_op.alter_column('is_completed', existing_type=sa.Boolean(), nullable=True)
+        batch_op.alter_column('priority', existing_type=sa.String(), nullable=True)
+        batch_op.alter_column('status', existing_type=sa.String(), nullable=True)
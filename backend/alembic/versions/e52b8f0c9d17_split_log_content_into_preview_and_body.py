@@ -0,0 +1,85 @@
+"""split daily log content into preview and compressed body
+
+Revision ID: e52b8f0c9d17
+Revises: c7d9e1a2b384
+Create Date: 2026-10-19 17:45:31.902736
+
+"""
+import zlib
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'e52b8f0c9d17'
+down_revision = 'c7d9e1a2b384'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of app.models.daily_log.PREVIEW_LENGTH at the time of this migration
+PREVIEW_LENGTH = 160
+BATCH_SIZE = 1000
+
+daily_logs = sa.table(
+    'daily_logs',
+    sa.column('id', sa.Integer()),
+    sa.column('content', sa.String()),
+    sa.column('preview', sa.String()),
+    sa.column('body', sa.LargeBinary()),
+)
+
+
+def _preview(content):
+    return content if len(content) <= PREVIEW_LENGTH else content[:PREVIEW_LENGTH].rstrip() + '…'
+
+
+def upgrade() -> None:
+    op.add_column('daily_logs', sa.Column('preview', sa.String(), nullable=True))
+    op.add_column('daily_logs', sa.Column('body', sa.LargeBinary(), nullable=True))
+
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(daily_logs.c.id, daily_logs.c.content)
+            .where(daily_logs.c.id > last_id, daily_logs.c.content.isnot(None))
+            .order_by(daily_logs.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for id_, content in rows:
+            bind.execute(
+                daily_logs.update()
+                .where(daily_logs.c.id == id_)
+                .values(preview=_preview(content), body=zlib.compress(content.encode(), 6))
+            )
+        last_id = rows[-1][0]
+
+    op.drop_column('daily_logs', 'content')
+
+
+def downgrade() -> None:
+    op.add_column('daily_logs', sa.Column('content', sa.String(), nullable=True))
+
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(daily_logs.c.id, daily_logs.c.body)
+            .where(daily_logs.c.id > last_id, daily_logs.c.body.isnot(None))
+            .order_by(daily_logs.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for id_, body in rows:
+            bind.execute(
+                daily_logs.update()
+                .where(daily_logs.c.id == id_)
+                .values(content=zlib.decompress(body).decode())
+            )
+        last_id = rows[-1][0]
+
+    op.drop_column('daily_logs', 'body')
+    op.drop_column('daily_logs', 'preview')
@@ -0,0 +1,72 @@
+"""add previews to daily log archives
+
+Revision ID: f3a6d2b1c085
+Revises: e52b8f0c9d17
+Create Date: 2026-10-19 21:12:40.417385
+
+"""
+import json
+import zlib
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'f3a6d2b1c085'
+down_revision = 'e52b8f0c9d17'
+branch_labels = None
+depends_on = None
+
+# Frozen copy of app.models.daily_log.PREVIEW_LENGTH at the time of this migration
+PREVIEW_LENGTH = 160
+BATCH_SIZE = 100
+
+daily_log_archives = sa.table(
+    'daily_log_archives',
+    sa.column('id', sa.Integer()),
+    sa.column('payload', sa.LargeBinary()),
+    sa.column('previews', sa.LargeBinary()),
+)
+
+
+def _preview(content):
+    if content is None:
+        return None
+    return content if len(content) <= PREVIEW_LENGTH else content[:PREVIEW_LENGTH].rstrip() + '…'
+
+
+def _previews(payload):
+    entries = json.loads(zlib.decompress(payload))
+    previews = [[e[0], e[1], _preview(e[2]), e[3]] for e in entries]
+    return zlib.compress(json.dumps(previews, separators=(',', ':')).encode(), 9)
+
+
+def upgrade() -> None:
+    op.add_column('daily_log_archives', sa.Column('previews', sa.LargeBinary(), nullable=True))
+
+    bind = op.get_bind()
+    last_id = 0
+    while True:
+        rows = bind.execute(
+            sa.select(daily_log_archives.c.id, daily_log_archives.c.payload)
+            .where(daily_log_archives.c.id > last_id)
+            .order_by(daily_log_archives.c.id)
+            .limit(BATCH_SIZE)
+        ).all()
+        if not rows:
+            break
+        for id_, payload in rows:
+            bind.execute(
+                daily_log_archives.update()
+                .where(daily_log_archives.c.id == id_)
+                .values(previews=_previews(payload))
+            )
+        last_id = rows[-1][0]
+
+    with op.batch_alter_table('daily_log_archives') as batch_op:
+        batch_op.alter_column('previews', existing_type=sa.LargeBinary(), nullable=False)
+
+
+def downgrade() -> None:
+    with op.batch_alter_table('daily_log_archives') as batch_op:
+        batch_op.drop_column('previews')
@@ -0,0 +1,81 @@
+"""Admission control for DB-bound routes.
+
+At most ADMISSION_MAX_CONCURRENCY requests per worker hold a database slot at a
+time, which keeps them from queueing inside the connection pool. Up to
+ADMISSION_MAX_QUEUE more wait for ADMISSION_QUEUE_TIMEOUT seconds; anything
+beyond that is shed immediately with 503 + Retry-After.
+"""
+import asyncio
+from fastapi import HTTPException, Request, status
+from app.core.config import settings
+from app.core.dependencies import BATCH_CONTEXT
+
+class AdmissionController:
+    def __init__(self, max_concurrency: int, max_queue: int, queue_timeout: float):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self.active = 0
+        self.waiting = 0
+        self.admitted = 0
+        self.shed = 0
+        self.timed_out = 0
+        self._semaphore = None
+
+    def _overloaded(self) -> HTTPException:
+        return HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Server is busy, please retry shortly",
+            headers={"Retry-After": str(settings.ADMISSION_RETRY_AFTER)},
+        )
+
+    async def acquire(self) -> None:
+        if self._semaphore is None:
+            # Created lazily so it binds to the running event loop
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        if self._semaphore.locked() and self.waiting >= self.max_queue:
+            self.shed += 1
+            raise self._overloaded()
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), self.queue_timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            raise self._overloaded()
+        finally:
+            self.waiting -= 1
+        self.active += 1
+        self.admitted += 1
+
+    def release(self) -> None:
+        self.active -= 1
+        self._semaphore.release()
+
+    def stats(self) -> dict:
+        return {
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+            "active": self.active,
+            "waiting": self.waiting,
+            "admitted": self.admitted,
+            "shed": self.shed,
+            "timed_out": self.timed_out,
+        }
+
+controller = AdmissionController(
+    settings.admission_max_concurrency,
+    settings.ADMISSION_MAX_QUEUE,
+    settings.ADMISSION_QUEUE_TIMEOUT,
+)
+
+async def admit(request: Request):
+    """Router dependency holding a database slot for the whole request."""
+    if request.scope.get(BATCH_CONTEXT):
+        # Sub-requests of /batch run under the batch's own slot
+        yield
+        return
+    await controller.acquire()
+    try:
+        yield
+    finally:
+        controller.release()
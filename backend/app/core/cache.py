@@ -0,0 +1,344 @@
+"""Per-user response cache for the read endpoints.
+
+Entries are keyed by user, namespace (one per cached endpoint), the namespace's
+generation and query parameters, and hold the JSON-serialized response. Every
+write route invalidates the namespaces it affects for its user: that bumps the
+generation and drops the keys stored under them. A reader that loaded from the
+database before a concurrent write cannot re-insert its stale response, because
+its key carries the old generation.
+
+Backend errors (e.g. Redis being down) are counted and logged, and requests
+fall through to the database.
+
+Backends (CACHE_BACKEND):
+    none         caching disabled (default)
+    lru          in-process LRU; only correct with a single worker
+    redis        shared across workers, CACHE_URL points at Redis (needs `redis`)
+    local-redis  in-process stand-in for Redis, for tests and local runs
+"""
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterable, Optional
+from pydantic import TypeAdapter
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+NAMESPACES = ("habits", "completions", "todos", "todo_counts", "logs", "log")
+
+# Set while an atomic /batch runs: reads go to the database and fill nothing
+_bypass: ContextVar[bool] = ContextVar("ordia_cache_bypass", default=False)
+
+def _key(user_id: int, namespace: str, generation: int, params: Optional[Dict[str, Any]] = None) -> str:
+    suffix = json.dumps(params or {}, sort_keys=True, default=str, separators=(",", ":"))
+    return f"ordia:u{user_id}:{namespace}:g{generation}:{suffix}"
+
+def _index_key(user_id: int, namespace: str) -> str:
+    return f"ordia:u{user_id}:{namespace}:keys"
+
+def _generation_key(user_id: int, namespace: str) -> str:
+    return f"ordia:u{user_id}:{namespace}:gen"
+
+class CacheBackend:
+    name = "none"
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.errors = 0
+
+    def get(self, key: str) -> Optional[str]:
+        return None
+
+    def generation(self, generation_key: str) -> int:
+        return 0
+
+    def bump(self, generation_key: str) -> None:
+        pass
+
+    def set(self, key: str, value: str, index_key: str, ttl: int) -> None:
+        pass
+
+    def invalidate(self, index_key: str, key: Optional[str] = None) -> None:
+        """Drop key, or every key recorded under index_key when key is None."""
+        pass
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "backend": self.name,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "errors": self.errors,
+        }
+
+class LRUCache(CacheBackend):
+    name = "lru"
+
+    def __init__(self, max_entries: int):
+        super().__init__()
+        self.max_entries = max_entries
+        self.evictions = 0
+        self._entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self._indexes: Dict[str, set] = {}
+        self._generations: Dict[str, int] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def _drop(self, key: str) -> None:
+        expires_at, value, index_key = self._entries.pop(key)
+        self._bytes -= len(value)
+        index = self._indexes.get(index_key)
+        if index is not None:
+            index.discard(key)
+            if not index:
+                del self._indexes[index_key]
+
+    def get(self, key: str) -> Optional[str]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] < time.monotonic():
+                if entry is not None:
+                    self._drop(key)
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def generation(self, generation_key: str) -> int:
+        with self._lock:
+            return self._generations.get(generation_key, 0)
+
+    def bump(self, generation_key: str) -> None:
+        with self._lock:
+            self._generations[generation_key] = self._generations.get(generation_key, 0) + 1
+
+    def set(self, key: str, value: str, index_key: str, ttl: int) -> None:
+        with self._lock:
+            if key in self._entries:
+                self._drop(key)
+            self._entries[key] = (time.monotonic() + ttl, value, index_key)
+            self._bytes += len(value)
+            self._indexes.setdefault(index_key, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.evictions += 1
+
+    def invalidate(self, index_key: str, key: Optional[str] = None) -> None:
+        with self._lock:
+            keys = [key] if key else list(self._indexes.get(index_key, ()))
+            for k in keys:
+                if k in self._entries:
+                    self._drop(k)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                **super().stats(),
+                "entries": len(self._entries),
+                "memory_bytes": self._bytes,
+                "evictions": self.evictions,
+            }
+
+class LocalRedis:
+    """Minimal in-process stand-in for the redis client calls RedisCache makes."""
+
+    def __init__(self):
+        self._values: Dict[str, tuple] = {}
+        self._lock = threading.Lock()
+
+    def _live(self, key: str):
+        entry = self._values.get(key)
+        if entry is not None and entry[0] is not None and entry[0] < time.monotonic():
+            del self._values[key]
+            return None
+        return entry
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._live(key)
+            return entry[1].encode() if entry else None
+
+    def incr(self, key: str) -> int:
+        with self._lock:
+            entry = self._live(key)
+            value = int(entry[1]) + 1 if entry else 1
+            self._values[key] = (entry[0] if entry else None, str(value))
+            return value
+
+    def setex(self, key: str, ttl: int, value: str) -> None:
+        with self._lock:
+            self._values[key] = (time.monotonic() + ttl, value)
+
+    def sadd(self, key: str, *members: str) -> None:
+        with self._lock:
+            entry = self._live(key)
+            current = entry[1] if entry else set()
+            self._values[key] = (entry[0] if entry else None, current | set(members))
+
+    def srem(self, key: str, *members: str) -> None:
+        with self._lock:
+            entry = self._live(key)
+            if entry:
+                self._values[key] = (entry[0], entry[1] - set(members))
+
+    def smembers(self, key: str) -> set:
+        with self._lock:
+            entry = self._live(key)
+            return {m.encode() for m in entry[1]} if entry else set()
+
+    def expire(self, key: str, ttl: int) -> None:
+        with self._lock:
+            entry = self._live(key)
+            if entry:
+                self._values[key] = (time.monotonic() + ttl, entry[1])
+
+    def delete(self, *keys: str) -> None:
+        with self._lock:
+            for key in keys:
+                self._values.pop(key, None)
+
+    def info(self) -> dict:
+        with self._lock:
+            strings = [v[1] for v in self._values.values() if isinstance(v[1], str)]
+            return {
+                "used_memory": sum(len(v) for v in strings),
+                "evicted_keys": 0,
+                "db0": {"keys": len(self._values)},
+            }
+
+class RedisCache(CacheBackend):
+    name = "redis"
+
+    def __init__(self, url: str = "", client=None):
+        super().__init__()
+        if client is None:
+            try:
+                import redis
+            except ImportError:
+                raise RuntimeError("CACHE_BACKEND=redis requires the `redis` package (pip install redis)")
+            client = redis.Redis.from_url(url)
+        self.client = client
+
+    def get(self, key: str) -> Optional[str]:
+        value = self.client.get(key)
+        if value is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        return value.decode()
+
+    def generation(self, generation_key: str) -> int:
+        value = self.client.get(generation_key)
+        return int(value) if value is not None else 0
+
+    def bump(self, generation_key: str) -> None:
+        # Generation keys never expire: letting one reset could revive stale entries
+        self.client.incr(generation_key)
+
+    def set(self, key: str, value: str, index_key: str, ttl: int) -> None:
+        self.client.setex(key, ttl, value)
+        self.client.sadd(index_key, key)
+        self.client.expire(index_key, ttl)
+
+    def invalidate(self, index_key: str, key: Optional[str] = None) -> None:
+        if key:
+            self.client.delete(key)
+            self.client.srem(index_key, key)
+            return
+        keys = [k.decode() for k in self.client.smembers(index_key)]
+        self.client.delete(index_key, *keys)
+
+    def stats(self) -> dict:
+        # Hit/miss counters are per worker; memory and evictions are server-wide
+        info = self.client.info()
+        return {
+            **super().stats(),
+            "entries": info.get("db0", {}).get("keys", 0),
+            "memory_bytes": info.get("used_memory", 0),
+            "evictions": info.get("evicted_keys", 0),
+        }
+
+def _build_backend() -> CacheBackend:
+    if settings.CACHE_BACKEND == "lru":
+        return LRUCache(settings.CACHE_MAX_ENTRIES)
+    if settings.CACHE_BACKEND == "redis":
+        return RedisCache(settings.CACHE_URL)
+    if settings.CACHE_BACKEND == "local-redis":
+        cache = RedisCache(client=LocalRedis())
+        cache.name = "local-redis"
+        return cache
+    return CacheBackend()
+
+backend = _build_backend()
+
+def _record_error(action: str, exc: Exception) -> None:
+    backend.errors += 1
+    logger.warning(f"Cache {action} failed, using the database: {exc!r}")
+
+def cached(user_id: int, namespace: str, params: Optional[Dict[str, Any]], load: Callable[[], Any], response_type) -> Any:
+    """Return the cached response for this key, or load, serialize and store it."""
+    if _bypass.get():
+        return load()
+    adapter = TypeAdapter(response_type)
+    generation_key = _generation_key(user_id, namespace)
+    try:
+        generation = backend.generation(generation_key)
+        key = _key(user_id, namespace, generation, params)
+        value = backend.get(key)
+    except Exception as exc:
+        _record_error("read", exc)
+        return load()
+    if value is not None:
+        return json.loads(value)
+    data = adapter.dump_python(adapter.validate_python(load(), from_attributes=True), mode="json")
+    try:
+        # A write committed while we loaded: our data may predate it, don't store it
+        if backend.generation(generation_key) == generation:
+            backend.set(key, json.dumps(data), _index_key(user_id, namespace), settings.CACHE_TTL_SECONDS)
+    except Exception as exc:
+        _record_error("write", exc)
+    return data
+
+def invalidate(user_id: int, namespaces: Iterable[str], params: Optional[Dict[str, Any]] = None) -> None:
+    """Invalidate the user's entries in namespaces.
+
+    Bumping the generation retires every entry of the namespace; params only
+    narrows which stored keys are deleted right away.
+    """
+    for namespace in namespaces:
+        try:
+            generation_key = _generation_key(user_id, namespace)
+            key = None
+            if params is not None:
+                key = _key(user_id, namespace, backend.generation(generation_key), params)
+            backend.bump(generation_key)
+            backend.invalidate(_index_key(user_id, namespace), key)
+        except Exception as exc:
+            _record_error("invalidation", exc)
+
+def invalidate_user(user_id: int) -> None:
+    invalidate(user_id, NAMESPACES)
+
+@contextmanager
+def bypass():
+    token = _bypass.set(True)
+    try:
+        yield
+    finally:
+        _bypass.reset(token)
+
+def stats() -> dict:
+    try:
+        return backend.stats()
+    except Exception as exc:
+        _record_error("stats", exc)
+        return CacheBackend.stats(backend)
@@ -1,6 +1,7 @@
 from pydantic_settings import BaseSettings
 from dotenv import load_dotenv
 import os
+from typing import List
 
 load_dotenv()
 
@@ -13,6 +14,57 @@ class Settings(BaseSettings):
     ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
 
+    # Connection pool, per engine and worker
+    DB_POOL_SIZE: int = int(os.getenv("DB_POOL_SIZE", 5))
+    DB_MAX_OVERFLOW: int = int(os.getenv("DB_MAX_OVERFLOW", 10))
+    DB_POOL_TIMEOUT: float = float(os.getenv("DB_POOL_TIMEOUT", 5))
+    DB_POOL_RECYCLE: int = int(os.getenv("DB_POOL_RECYCLE", 1800))
+    DB_POOL_PRE_PING: bool = os.getenv("DB_POOL_PRE_PING", "true").lower() == "true"
+    # Behind PgBouncer in transaction mode: no app-side pool, no prepared statements
+    DB_PGBOUNCER: bool = os.getenv("DB_PGBOUNCER", "false").lower() == "true"
+
+    # Admission control for DB-bound routes, per worker. Concurrency defaults to
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW so requests never queue inside the pool.
+    THREADPOOL_SIZE: int = int(os.getenv("THREADPOOL_SIZE", 40))
+    ADMISSION_MAX_CONCURRENCY: int = int(os.getenv("ADMISSION_MAX_CONCURRENCY", 0))
+    ADMISSION_MAX_QUEUE: int = int(os.getenv("ADMISSION_MAX_QUEUE", 50))
+    ADMISSION_QUEUE_TIMEOUT: float = float(os.getenv("ADMISSION_QUEUE_TIMEOUT", 3))
+    ADMISSION_RETRY_AFTER: int = int(os.getenv("ADMISSION_RETRY_AFTER", 2))
+
+    # Sharding
+    # Comma-separated database URLs, one per shard. Left empty, DATABASE_URL is the
+    # only shard. DATABASE_URL always hosts the global user directory.
+    SHARD_DATABASE_URLS: str = os.getenv("SHARD_DATABASE_URLS", "")
+
+    # Partitioning / archival of habit_completions and daily_logs (Postgres only)
+    PARTITION_MONTHS_AHEAD: int = int(os.getenv("PARTITION_MONTHS_AHEAD", 3))
+    ARCHIVE_AFTER_MONTHS: int = int(os.getenv("ARCHIVE_AFTER_MONTHS", 12))
+
+    # Maximum number of sub-requests accepted by POST /batch
+    BATCH_MAX_REQUESTS: int = int(os.getenv("BATCH_MAX_REQUESTS", 25))
+
+    # Request profiling: fraction of requests profiled without a signed header
+    PROFILE_SAMPLE_RATE: float = float(os.getenv("PROFILE_SAMPLE_RATE", 0.0))
+    PROFILE_DIR: str = os.getenv("PROFILE_DIR", "profiles")
+    PROFILE_INTERVAL_MS: float = float(os.getenv("PROFILE_INTERVAL_MS", 5.0))
+    # Newest profiles kept in PROFILE_DIR; 0 keeps everything
+    PROFILE_MAX_FILES: int = int(os.getenv("PROFILE_MAX_FILES", 200))
+
+    # Response cache: none, lru (single worker only), redis, local-redis
+    CACHE_BACKEND: str = os.getenv("CACHE_BACKEND", "none")
+    CACHE_URL: str = os.getenv("CACHE_URL", "redis://localhost:6379/0")
+    CACHE_TTL_SECONDS: int = int(os.getenv("CACHE_TTL_SECONDS", 60))
+    CACHE_MAX_ENTRIES: int = int(os.getenv("CACHE_MAX_ENTRIES", 10000))
+
+    @property
+    def admission_max_concurrency(self) -> int:
+        return self.ADMISSION_MAX_CONCURRENCY or self.DB_POOL_SIZE + self.DB_MAX_OVERFLOW
+
+    @property
+    def shard_urls(self) -> List[str]:
+        urls = [url.strip() for url in self.SHARD_DATABASE_URLS.split(",") if url.strip()]
+        return urls or [self.DATABASE_URL]
+
     class Config:
         env_file = ".env"
 
@@ -1,16 +1,108 @@
-from sqlalchemy import create_engine
+from typing import Optional
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import NullPool, QueuePool
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import sessionmaker, Session
 from .config import settings
 
-engine = create_engine(settings.DATABASE_URL)
+def _use_savepoints_on_pysqlite(engine) -> None:
+    """Let SQLAlchemy, not pysqlite, emit BEGIN.
+
+    pysqlite's own transaction handling commits on RELEASE SAVEPOINT, which
+    breaks the savepoint-based atomic /batch mode. This is the workaround from
+    the SQLAlchemy pysqlite dialect docs.
+    """
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_connection, connection_record):
+        dbapi_connection.isolation_level = None
+
+    @event.listens_for(engine, "begin")
+    def _begin(conn):
+        conn.exec_driver_sql("BEGIN")
+
+def _create_engine(url: str):
+    if settings.DB_PGBOUNCER:
+        # PgBouncer does the pooling; psycopg 3 would otherwise prepare statements
+        connect_args = {"prepare_threshold": None} if url.startswith("postgresql+psycopg:") else {}
+        return create_engine(url, poolclass=NullPool, connect_args=connect_args)
+    options = {"pool_recycle": settings.DB_POOL_RECYCLE, "pool_pre_ping": settings.DB_POOL_PRE_PING}
+    parsed = make_url(url)
+    # Sizing only applies to QueuePool; e.g. in-memory SQLite uses a SingletonThreadPool
+    if issubclass(parsed.get_dialect().get_pool_class(parsed), QueuePool):
+        options.update(
+            pool_size=settings.DB_POOL_SIZE,
+            max_overflow=settings.DB_MAX_OVERFLOW,
+            pool_timeout=settings.DB_POOL_TIMEOUT,
+        )
+    new_engine = create_engine(url, **options)
+    if new_engine.dialect.driver == "pysqlite":
+        _use_savepoints_on_pysqlite(new_engine)
+    return new_engine
+
+# The directory engine: holds the global email -> shard directory
+engine = _create_engine(settings.DATABASE_URL)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 Base = declarative_base()
 
+def _build_shard_engines():
+    # Reuse the directory engine when a shard lives in the same database
+    return [engine if url == settings.DATABASE_URL else _create_engine(url) for url in settings.shard_urls]
+
+shard_engines = _build_shard_engines()
+ShardSessions = [sessionmaker(autocommit=False, autoflush=False, bind=e) for e in shard_engines]
+
+class UserMovingError(Exception):
+    """Raised while a user's data is being copied to another shard."""
+
 def get_db():
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
+
+def shard_count() -> int:
+    return len(shard_engines)
+
+def pick_shard(user_id: int) -> int:
+    """Shard a newly created user is placed on."""
+    return user_id % shard_count()
+
+def lookup_shard(user_id: int):
+    """Return the directory entry for a user, or None if the user is unknown."""
+    from app.models.user_directory import UserDirectory
+
+    db = SessionLocal()
+    try:
+        return db.query(UserDirectory).filter(UserDirectory.id == user_id).first()
+    finally:
+        db.close()
+
+def shard_session(shard_id: int) -> Session:
+    return ShardSessions[shard_id]()
+
+def resolve_shard(user_id: int) -> Optional[int]:
+    """Shard owning user_id; None if the user is unknown.
+
+    With a single shard the directory is not consulted at all.
+    """
+    if shard_count() == 1:
+        return 0
+    entry = lookup_shard(user_id)
+    if entry is None:
+        return None
+    if entry.is_moving:
+        raise UserMovingError(user_id)
+    return entry.shard_id
+
+def shard_transaction_session(shard_id: int) -> Session:
+    """Session running inside one outer transaction on the shard.
+
+    Calls to commit() only release savepoints; the caller commits or rolls back
+    the whole unit with session.bind.commit() / session.bind.rollback().
+    """
+    connection = shard_engines[shard_id].connect()
+    connection.begin()
+    return Session(bind=connection, autoflush=False, join_transaction_mode="create_savepoint")
@@ -1,12 +1,13 @@
+from dataclasses import dataclass
 from typing import Generator
-from fastapi import Depends, HTTPException, status
+from fastapi import Depends, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordBearer
 from jose import jwt
 from pydantic import ValidationError
 from sqlalchemy.orm import Session
 from app.core import security
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import resolve_shard, shard_session, UserMovingError
 from app.models.user import User as UserModel
 from app.schemas.user import TokenData
 
@@ -14,20 +15,75 @@ reusable_oauth2 = OAuth2PasswordBearer(
     tokenUrl="/auth/login"
 )
 
-def get_current_user(
-    db: Session = Depends(get_db), token: str = Depends(reusable_oauth2)
-) -> UserModel:
+# Scope key under which /batch hands its shared auth context to sub-requests
+BATCH_CONTEXT = "ordia.batch"
+
+@dataclass
+class BatchContext:
+    user_id: int
+    user: UserModel
+    db: Session
+
+def require_admin(token: str = Depends(reusable_oauth2)) -> None:
+    """Allow only bearers of an admin token (security.create_profile_token)."""
+    if not security.verify_profile_token(token):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Admin token required",
+        )
+
+def get_token_subject(request: Request, token: str = Depends(reusable_oauth2)) -> int:
+    batch = request.scope.get(BATCH_CONTEXT)
+    if batch:
+        return batch.user_id
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
         token_data = TokenData(user_id=payload.get("sub"))
-    except (jwt.JWTError, ValidationError):
+        return int(token_data.user_id)
+    except (jwt.JWTError, ValidationError, TypeError, ValueError):
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail="Could not validate credentials",
         )
-    user = db.query(UserModel).filter(UserModel.id == int(token_data.user_id)).first()
+
+def get_user_shard(user_id: int = Depends(get_token_subject)) -> int:
+    """Shard that owns the authenticated user."""
+    try:
+        shard_id = resolve_shard(user_id)
+    except UserMovingError:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Account is being migrated, please retry shortly",
+            headers={"Retry-After": "5"},
+        )
+    if shard_id is None:
+        raise HTTPException(status_code=404, detail="User not found")
+    return shard_id
+
+def get_shard_db(request: Request, user_id: int = Depends(get_token_subject)) -> Generator:
+    """Session on the shard that owns the authenticated user."""
+    batch = request.scope.get(BATCH_CONTEXT)
+    if batch:
+        # Owned and closed by the /batch endpoint
+        yield batch.db
+        return
+    db = shard_session(get_user_shard(user_id))
+    try:
+        yield db
+    finally:
+        db.close()
+
+def get_current_user(
+    request: Request,
+    db: Session = Depends(get_shard_db),
+    user_id: int = Depends(get_token_subject),
+) -> UserModel:
+    batch = request.scope.get(BATCH_CONTEXT)
+    if batch:
+        return batch.user
+    user = db.query(UserModel).filter(UserModel.id == user_id).first()
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
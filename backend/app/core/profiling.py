@@ -0,0 +1,268 @@
+"""On-demand profiling of single requests.
+
+A request is profiled when it carries a valid X-Ordia-Profile header (a token
+from security.create_profile_token) or is picked by PROFILE_SAMPLE_RATE. While
+it runs, a sampling profiler records stacks of every thread executing app code,
+and SQLAlchemy cursor events record each statement with its duration.
+
+Only threads working on the profiled request are sampled: the event loop
+thread while it runs the request's task, and threadpool threads from the moment
+they execute SQL for it until they execute SQL for something else. Stacks are
+written in collapsed format ("a;b;c <count>" per line), which flamegraph.pl,
+speedscope and inferno read directly.
+"""
+import asyncio
+import glob
+import json
+import os
+import random
+import re
+import sys
+import threading
+import time
+from collections import Counter
+from contextvars import ContextVar
+from datetime import datetime
+from typing import Dict, List, Optional
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import JSONResponse
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from starlette.datastructures import Headers, MutableHeaders
+from app.core import security
+from app.core.config import settings
+
+PROFILE_HEADER = "x-ordia-profile"
+# "inline" returns the profile instead of the response body (signed requests only)
+PROFILE_OUTPUT_HEADER = "x-ordia-profile-output"
+
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_active: ContextVar[Optional["RequestProfile"]] = ContextVar("ordia_profile", default=None)
+# Thread id -> profile whose SQL that thread last executed; only kept while profiling
+_thread_owners: Dict[int, "RequestProfile"] = {}
+_running = 0
+
+def _frame_name(code) -> str:
+    filename = code.co_filename
+    for marker in ("site-packages" + os.sep, os.path.dirname(APP_DIR) + os.sep):
+        if marker in filename:
+            filename = filename.split(marker, 1)[1]
+            break
+    return f"{code.co_name} ({filename}:{code.co_firstlineno})"
+
+class _Sampler(threading.Thread):
+    def __init__(self, profile: "RequestProfile", interval: float):
+        super().__init__(name="ordia-profiler", daemon=True)
+        self.profile = profile
+        self.interval = interval
+        self.stacks: Counter = Counter()
+        self.samples = 0
+        self._stop_event = threading.Event()
+
+    def _owns(self, thread_id: int) -> bool:
+        profile = self.profile
+        if thread_id == profile.loop_thread:
+            return asyncio.current_task(profile.loop) is profile.task
+        return _thread_owners.get(thread_id) is profile
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if not self._owns(thread_id):
+                    continue
+                stack = []
+                in_app = False
+                while frame is not None:
+                    code = frame.f_code
+                    in_app = in_app or code.co_filename.startswith(APP_DIR)
+                    stack.append(_frame_name(code))
+                    frame = frame.f_back
+                if in_app:
+                    self.stacks[";".join(reversed(stack))] += 1
+            self.samples += 1
+
+    def stop(self) -> None:
+        self._stop_event.set()
+        self.join()
+
+class RequestProfile:
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.started_at = datetime.utcnow()
+        self.queries: List[dict] = []
+        self.duration_ms = 0.0
+        self._start = time.perf_counter()
+        self._sampler = _Sampler(self, settings.PROFILE_INTERVAL_MS / 1000)
+        # The request's task on the event loop; its async parts run there
+        self.loop = asyncio.get_running_loop()
+        self.loop_thread = threading.get_ident()
+        self.task = asyncio.current_task()
+
+    def start(self) -> None:
+        self._sampler.start()
+
+    def stop(self) -> None:
+        self._sampler.stop()
+        for thread_id, owner in list(_thread_owners.items()):
+            if owner is self:
+                _thread_owners.pop(thread_id, None)
+        self.duration_ms = (time.perf_counter() - self._start) * 1000
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {count}" for stack, count in self._sampler.stacks.most_common())
+
+    def summary(self) -> dict:
+        return {
+            "method": self.method,
+            "path": self.path,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": round(self.duration_ms, 3),
+            "samples": self._sampler.samples,
+            "sql_count": len(self.queries),
+            "sql_ms": round(sum(q["duration_ms"] for q in self.queries), 3),
+            "queries": self.queries,
+        }
+
+    @property
+    def name(self) -> str:
+        slug = re.sub(r"[^A-Za-z0-9]+", "-", self.path).strip("-") or "root"
+        return f"{self.started_at:%Y%m%dT%H%M%S%f}-{self.method.lower()}-{slug}"
+
+    def save(self, directory: str, keep: int = 0) -> str:
+        """Write <name>.collapsed and <name>.json into directory and return <name>.
+
+        With keep > 0, only the newest keep profiles in directory are kept.
+        """
+        os.makedirs(directory, exist_ok=True)
+        name = self.name
+        with open(os.path.join(directory, f"{name}.collapsed"), "w") as f:
+            f.write(self.collapsed())
+        with open(os.path.join(directory, f"{name}.json"), "w") as f:
+            json.dump(self.summary(), f, indent=2)
+        if keep > 0:
+            _rotate(directory, keep)
+        return name
+
+def _rotate(directory: str, keep: int) -> None:
+    # Names start with the start timestamp, so they sort oldest first
+    profiles = sorted(glob.glob(os.path.join(directory, "*.json")))
+    for path in profiles[:-keep]:
+        for stale in (path, path[:-len(".json")] + ".collapsed"):
+            try:
+                os.remove(stale)
+            except FileNotFoundError:
+                pass
+
+def should_profile(signed: bool) -> bool:
+    return signed or (settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE)
+
+def start(method: str, path: str) -> RequestProfile:
+    """Start profiling the current request; call from its task on the event loop."""
+    global _running
+    profile = RequestProfile(method, path)
+    # Reset rather than cleared in stop(), so a profiled /batch sub-request
+    # hands the context back to the enclosing profile
+    profile.token = _active.set(profile)
+    _running += 1
+    profile.start()
+    return profile
+
+def stop(profile: RequestProfile) -> None:
+    global _running
+    profile.stop()
+    _running -= 1
+    _active.reset(profile.token)
+
+class ProfilingMiddleware:
+    """Profiles signed or sampled requests; every other request passes straight through.
+
+    A plain ASGI middleware, so unprofiled requests pay for one header lookup
+    and nothing else. Register it before CORSMiddleware so inline profiles get
+    CORS headers too.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        headers = Headers(scope=scope)
+        token = headers.get(PROFILE_HEADER)
+        signed = bool(token) and security.verify_profile_token(token)
+        if not should_profile(signed):
+            await self.app(scope, receive, send)
+            return
+
+        profile = start(scope["method"], scope["path"])
+        if signed and headers.get(PROFILE_OUTPUT_HEADER) == "inline":
+            await self._inline(profile, scope, receive, send)
+            return
+
+        async def send_with_id(message):
+            if message["type"] == "http.response.start":
+                MutableHeaders(scope=message).append("X-Ordia-Profile-Id", profile.name)
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_id)
+        finally:
+            stop(profile)
+            await run_in_threadpool(profile.save, settings.PROFILE_DIR, settings.PROFILE_MAX_FILES)
+
+    async def _inline(self, profile: RequestProfile, scope, receive, send) -> None:
+        status_code = 500
+        body = []
+
+        async def capture(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            elif message["type"] == "http.response.body":
+                body.append(message.get("body", b""))
+
+        try:
+            await self.app(scope, receive, capture)
+        finally:
+            stop(profile)
+        response = JSONResponse(content={
+            "status_code": status_code,
+            "response": b"".join(body).decode(errors="replace"),
+            "profile": profile.summary(),
+            "collapsed": profile.collapsed(),
+        })
+        await response(scope, receive, send)
+
+# SQL timing, applied to every engine (directory and shards)
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _active.get()
+    if _running:
+        # Claims this thread for the sampler, or releases it for unprofiled work
+        if profile is None:
+            _thread_owners.pop(threading.get_ident(), None)
+        else:
+            _thread_owners[threading.get_ident()] = profile
+    if profile is not None:
+        conn.info.setdefault("ordia_query_start", []).append(time.perf_counter())
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    profile = _active.get()
+    starts = conn.info.get("ordia_query_start")
+    if profile is None or not starts:
+        return
+    profile.queries.append({
+        "statement": statement,
+        "duration_ms": round((time.perf_counter() - starts.pop()) * 1000, 3),
+    })
+
+@event.listens_for(Engine, "handle_error")
+def _handle_error(exception_context):
+    starts = exception_context.connection.info.get("ordia_query_start") if exception_context.connection else None
+    if _active.get() is not None and starts:
+        starts.pop()
@@ -16,6 +16,19 @@ def create_access_token(subject: Union[str, Any], expires_delta: timedelta = Non
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
     return encoded_jwt
 
+def create_profile_token(expires_delta: timedelta = None) -> str:
+    """Admin token for the X-Ordia-Profile header."""
+    expire = datetime.utcnow() + (expires_delta or timedelta(hours=1))
+    to_encode = {"exp": expire, "sub": "profiler", "scope": "profile"}
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+def verify_profile_token(token: str) -> bool:
+    try:
+        payload = jwt.decode(token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM])
+    except jwt.JWTError:
+        return False
+    return payload.get("scope") == "profile"
+
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
@@ -2,17 +2,20 @@ from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from sqlalchemy.orm import Session
 from sqlalchemy import text
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
 from app.core.database import get_db, engine
 from app.core.config import settings
+from app.core import admission, cache, profiling
+from app.core.dependencies import require_admin
 import sys
 import os
 
 # Add current directory to path for local execution
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from app.routers import auth, users, habits, todos, daily_logs
-from alembic.config import Config
-from alembic import command
+from app.routers import auth, users, habits, todos, daily_logs, batch
+from app.services.shards import migrate_all
+from app.services.partitions import maintain_all as maintain_partitions
 import logging
 
 # Configure basic logging
@@ -24,9 +27,9 @@ def run_migrations():
     try:
         # Assuming alembic.ini is in the parent directory (backend/) relative to app/
         # Adjust path if necessary
-        alembic_cfg = Config("alembic.ini")
-        command.upgrade(alembic_cfg, "head")
+        migrate_all("alembic.ini")
         logger.info("✅ Database migrations applied successfully.")
+        maintain_partitions()
     except Exception as e:
         logger.error(f"❌ Migration failed: {e}")
         # We don't raise here to allow app to start, but DB might be out of sync
@@ -39,8 +42,14 @@ app = FastAPI(title=settings.PROJECT_NAME)
 
 @app.on_event("startup")
 async def startup_event():
+    import anyio.to_thread
+    # Sync handlers run here; keep it in line with the admission limit and pool
+    anyio.to_thread.current_default_thread_limiter().total_tokens = settings.THREADPOOL_SIZE
     run_migrations()
 
+# Added before CORS so that CORS wraps it and inline profiles get CORS headers
+app.add_middleware(profiling.ProfilingMiddleware)
+
 # CORS configuration
 app.add_middleware(
     CORSMiddleware,
@@ -54,6 +63,18 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.exception_handler(PoolTimeoutError)
+async def pool_timeout_handler(request, exc):
+    # No connection freed up within DB_POOL_TIMEOUT: shed instead of piling up
+    return JSONResponse(
+        status_code=503,
+        content={"detail": "Database is busy, please retry shortly"},
+        headers={
+            "Retry-After": str(settings.ADMISSION_RETRY_AFTER),
+            "Access-Control-Allow-Origin": "*",
+        },
+    )
+
 @app.exception_handler(Exception)
 async def global_exception_handler(request, exc):
     return JSONResponse(
@@ -68,11 +89,14 @@ async def global_exception_handler(request, exc):
         }
     )
 
-app.include_router(auth.router, prefix="/auth", tags=["auth"])
-app.include_router(users.router, prefix="/users", tags=["users"])
-app.include_router(habits.router, prefix="/habits", tags=["habits"])
-app.include_router(todos.router, prefix="/todos", tags=["todos"])
-app.include_router(daily_logs.router, prefix="/logs", tags=["logs"])
+# Every router below touches the database, so each request needs an admission slot
+db_bound = [Depends(admission.admit)]
+app.include_router(auth.router, prefix="/auth", tags=["auth"], dependencies=db_bound)
+app.include_router(users.router, prefix="/users", tags=["users"], dependencies=db_bound)
+app.include_router(habits.router, prefix="/habits", tags=["habits"], dependencies=db_bound)
+app.include_router(todos.router, prefix="/todos", tags=["todos"], dependencies=db_bound)
+app.include_router(daily_logs.router, prefix="/logs", tags=["logs"], dependencies=db_bound)
+app.include_router(batch.router, prefix="/batch", tags=["batch"], dependencies=db_bound)
 
 @app.get("/")
 async def root():
@@ -95,6 +119,15 @@ async def health_check():
             "traceback": traceback.format_exc()
         }
 
+# Operational metrics: admin token only
+@app.get("/metrics/cache", dependencies=[Depends(require_admin)])
+async def cache_metrics():
+    return cache.stats()
+
+@app.get("/metrics/admission", dependencies=[Depends(require_admin)])
+async def admission_metrics():
+    return admission.controller.stats()
+
 @app.get("/test-db")
 async def test_db(db: Session = Depends(get_db)):
     try:
@@ -4,3 +4,6 @@ from app.models.habit import Habit
 from app.models.daily_log import DailyLog
 from app.models.todo import Todo
 from app.models.habit_completion import HabitCompletion
+from app.models.user_directory import UserDirectory
+from app.models.habit_completion_archive import HabitCompletionArchive
+from app.models.daily_log_archive import DailyLogArchive
@@ -1,15 +1,43 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime
-from sqlalchemy.orm import relationship
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Index, LargeBinary
+from sqlalchemy.orm import relationship, deferred
 from datetime import datetime
+from typing import Optional
+import zlib
 from app.core.database import Base
 
+PREVIEW_LENGTH = 160
+
+def make_preview(content: Optional[str]) -> Optional[str]:
+    if content is None:
+        return None
+    return content if len(content) <= PREVIEW_LENGTH else content[:PREVIEW_LENGTH].rstrip() + "…"
+
+def compress_content(content: Optional[str]) -> Optional[bytes]:
+    return None if content is None else zlib.compress(content.encode(), 6)
+
+def decompress_content(body: Optional[bytes]) -> Optional[str]:
+    return None if body is None else zlib.decompress(body).decode()
+
 class DailyLog(Base):
     __tablename__ = "daily_logs"
+    # On Postgres the table is range-partitioned by month on date
+    __table_args__ = (Index("ix_daily_logs_user_id_date", "user_id", "date"),)
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
-    date = Column(DateTime, default=datetime.utcnow)
-    content = Column(String)  # For notes or diary entries
+    date = Column(DateTime, default=datetime.utcnow, nullable=False)
+    preview = Column(String)  # Start of the entry, for list views
+    body = deferred(Column(LargeBinary))  # Full entry, zlib-compressed; loaded on access
     mood = Column(String)     # Optional mood tracking
 
     user = relationship("User")
+
+    @property
+    def content(self) -> Optional[str]:
+        """For notes or diary entries"""
+        return decompress_content(self.body)
+
+    @content.setter
+    def content(self, value: Optional[str]) -> None:
+        self.body = compress_content(value)
+        self.preview = make_preview(value)
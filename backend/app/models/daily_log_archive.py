@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, ForeignKey, Date, LargeBinary, UniqueConstraint
+from app.core.database import Base
+
+class DailyLogArchive(Base):
+    """One month of a user's daily logs, compacted out of the hot table.
+
+    payload holds the full entries and previews only their previews, both
+    zlib-compressed JSON, see app.services.archive.
+    """
+    __tablename__ = "daily_log_archives"
+    __table_args__ = (UniqueConstraint("user_id", "month"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    month = Column(Date, nullable=False)
+    payload = Column(LargeBinary, nullable=False)
+    previews = Column(LargeBinary, nullable=False)
@@ -1,13 +1,15 @@
-from sqlalchemy import Column, Integer, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.core.database import Base
 
 class HabitCompletion(Base):
     __tablename__ = "habit_completions"
+    # On Postgres the table is range-partitioned by month on completed_at
+    __table_args__ = (Index("ix_habit_completions_habit_id_completed_at", "habit_id", "completed_at"),)
 
     id = Column(Integer, primary_key=True, index=True)
     habit_id = Column(Integer, ForeignKey("habits.id"))
-    completed_at = Column(DateTime, default=datetime.utcnow)
+    completed_at = Column(DateTime, default=datetime.utcnow, nullable=False)
 
     habit = relationship("Habit")
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, ForeignKey, Date, LargeBinary, UniqueConstraint
+from app.core.database import Base
+
+class HabitCompletionArchive(Base):
+    """One month of a user's habit completions, compacted out of the hot table.
+
+    payload is zlib-compressed JSON, see app.services.archive.
+    """
+    __tablename__ = "habit_completion_archives"
+    __table_args__ = (UniqueConstraint("user_id", "month"),)
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    month = Column(Date, nullable=False)
+    payload = Column(LargeBinary, nullable=False)
@@ -1,20 +1,26 @@
-from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime
+from sqlalchemy import Column, Integer, String, Boolean, ForeignKey, DateTime, Index
 from sqlalchemy.orm import relationship
 from datetime import datetime
 from app.core.database import Base
 
 class Todo(Base):
     __tablename__ = "todos"
+    # Back the status / priority / due-date filters of GET /todos/
+    __table_args__ = (
+        Index("ix_todos_user_id_status", "user_id", "status"),
+        Index("ix_todos_user_id_priority", "user_id", "priority"),
+        Index("ix_todos_user_id_due_date", "user_id", "due_date"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     user_id = Column(Integer, ForeignKey("users.id"))
     title = Column(String, nullable=False)
-    is_completed = Column(Boolean, default=False)
+    is_completed = Column(Boolean, default=False, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     
     # New fields
-    priority = Column(String, default="medium") # low, medium, high
-    status = Column(String, default="todo") # todo, in-progress, done
+    priority = Column(String, default="medium", nullable=False) # low, medium, high
+    status = Column(String, default="todo", nullable=False) # todo, in-progress, done
     due_date = Column(DateTime, nullable=True)
 
     user = relationship("User")
@@ -0,0 +1,14 @@
+from sqlalchemy import Column, Integer, String, Boolean
+from app.core.database import Base
+
+class UserDirectory(Base):
+    """Global email -> shard directory, stored in the DATABASE_URL database.
+
+    The directory id is the user's id on every shard.
+    """
+    __tablename__ = "user_directory"
+
+    id = Column(Integer, primary_key=True, index=True)
+    email = Column(String, unique=True, index=True, nullable=False)
+    shard_id = Column(Integer, nullable=False, default=0)
+    is_moving = Column(Boolean, nullable=False, default=False)
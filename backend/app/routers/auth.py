@@ -4,36 +4,68 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.orm import Session
 from app.core import security
-from app.core.database import get_db
+from app.core.database import engine, get_db, pick_shard, shard_engines, shard_session
 from app.core.config import settings
 from app.models.user import User as UserModel
+from app.models.user_directory import UserDirectory
 from app.schemas.user import User as UserSchema, UserCreate, Token
 
 router = APIRouter()
 
 @router.post("/signup", response_model=UserSchema)
 def create_user(user_in: UserCreate, db: Session = Depends(get_db)) -> Any:
-    user = db.query(UserModel).filter(UserModel.email == user_in.email).first()
-    if user:
+    # db is the directory database; the user row itself lives on its shard
+    entry = db.query(UserDirectory).filter(UserDirectory.email == user_in.email).first()
+    if entry:
         raise HTTPException(
             status_code=400,
             detail="A user with this email already exists.",
         )
     
-    db_user = UserModel(
-        email=user_in.email,
-        hashed_password=security.get_password_hash(user_in.password),
-    )
-    db.add(db_user)
+    # Hash before opening the write transaction; it is the slow part
+    hashed_password = security.get_password_hash(user_in.password)
+    entry = UserDirectory(email=user_in.email, shard_id=0)
+    db.add(entry)
+    db.flush()
+    shard_id = entry.shard_id = pick_shard(entry.id)
+    db_user = UserModel(id=entry.id, email=user_in.email, hashed_password=hashed_password)
+
+    if shard_engines[shard_id] is engine:
+        # Shard and directory share a database: one session, one transaction
+        db.add(db_user)
+        db.commit()
+        db.refresh(db_user)
+        return db_user
+
+    # Reserve the id in the directory first, so only one connection is held at a
+    # time and a failure can never leave a shard user without a directory entry
     db.commit()
-    db.refresh(db_user)
+    shard_db = shard_session(shard_id)
+    try:
+        shard_db.add(db_user)
+        shard_db.commit()
+        shard_db.refresh(db_user)
+    except Exception:
+        shard_db.rollback()
+        db.delete(entry)
+        db.commit()
+        raise
+    finally:
+        shard_db.close()
     return db_user
 
 @router.post("/login", response_model=Token)
 def login(
     db: Session = Depends(get_db), form_data: OAuth2PasswordRequestForm = Depends()
 ) -> Any:
-    user = db.query(UserModel).filter(UserModel.email == form_data.username).first()
+    entry = db.query(UserDirectory).filter(UserDirectory.email == form_data.username).first()
+    user = None
+    if entry:
+        shard_db = shard_session(entry.shard_id)
+        try:
+            user = shard_db.query(UserModel).filter(UserModel.id == entry.id).first()
+        finally:
+            shard_db.close()
     
     if not user:
         raise HTTPException(
@@ -0,0 +1,130 @@
+import asyncio
+import json
+from typing import Any
+from urllib.parse import urlsplit
+from fastapi import APIRouter, Depends, HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
+from app.core import cache
+from app.core.config import settings
+from app.core.database import shard_session, shard_transaction_session
+from app.core.dependencies import BATCH_CONTEXT, BatchContext, get_token_subject, get_user_shard
+from app.models.user import User as UserModel
+from app.schemas.batch import BatchRequest, BatchResponse, SubRequest, SubResponse
+
+router = APIRouter()
+
+async def _dispatch(request: Request, sub: SubRequest, context: BatchContext) -> SubResponse:
+    """Run one sub-request through the app in-process, sharing the batch context."""
+    url = urlsplit(sub.path)
+    body = b"" if sub.body is None else json.dumps(sub.body).encode()
+    headers = [
+        (b"content-type", b"application/json"),
+        (b"content-length", str(len(body)).encode()),
+    ]
+    authorization = request.headers.get("authorization")
+    if authorization:
+        headers.append((b"authorization", authorization.encode()))
+
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": sub.method.upper(),
+        "scheme": request.url.scheme,
+        "path": url.path,
+        "raw_path": url.path.encode(),
+        "root_path": "",
+        "query_string": url.query.encode(),
+        "headers": headers,
+        "client": request.scope.get("client"),
+        "server": request.scope.get("server"),
+        BATCH_CONTEXT: context,
+    }
+
+    body_sent = False
+    done = asyncio.Event()
+    status = None
+    chunks = []
+
+    async def receive():
+        nonlocal body_sent
+        if not body_sent:
+            body_sent = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        await done.wait()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        nonlocal status
+        if message["type"] == "http.response.start":
+            status = message["status"]
+        elif message["type"] == "http.response.body":
+            chunks.append(message.get("body", b""))
+            if not message.get("more_body", False):
+                done.set()
+
+    try:
+        await request.app(scope, receive, send)
+    except Exception:
+        # The catch-all handler has already sent its 500 and re-raised
+        if status is None:
+            status = 500
+    done.set()
+
+    raw = b"".join(chunks)
+    try:
+        content = json.loads(raw) if raw else None
+    except ValueError:
+        content = raw.decode(errors="replace")
+    return SubResponse(status=status or 500, body=content)
+
+@router.post("", response_model=BatchResponse)
+async def run_batch(
+    batch_in: BatchRequest,
+    request: Request,
+    user_id: int = Depends(get_token_subject),
+    shard_id: int = Depends(get_user_shard),
+) -> Any:
+    if len(batch_in.requests) > settings.BATCH_MAX_REQUESTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"A batch may contain at most {settings.BATCH_MAX_REQUESTS} requests.",
+        )
+    if any(urlsplit(sub.path).path.rstrip("/").startswith("/batch") for sub in batch_in.requests):
+        raise HTTPException(status_code=400, detail="Batches cannot be nested.")
+
+    if batch_in.atomic:
+        db = await run_in_threadpool(shard_transaction_session, shard_id)
+    else:
+        db = shard_session(shard_id)
+    try:
+        user = await run_in_threadpool(db.query(UserModel).filter(UserModel.id == user_id).first)
+        if not user:
+            raise HTTPException(status_code=404, detail="User not found")
+        context = BatchContext(user_id=user_id, user=user, db=db)
+
+        responses = []
+        failed = False
+        if batch_in.atomic:
+            # Uncommitted reads must not reach the cache
+            with cache.bypass():
+                for sub in batch_in.requests:
+                    response = await _dispatch(request, sub, context)
+                    responses.append(response)
+                    if response.status >= 400:
+                        failed = True
+                        break
+            await run_in_threadpool(db.bind.rollback if failed else db.bind.commit)
+            await run_in_threadpool(cache.invalidate_user, user_id)
+        else:
+            for sub in batch_in.requests:
+                response = await _dispatch(request, sub, context)
+                responses.append(response)
+                if response.status >= 400:
+                    # Clear any half-finished unit of work before the next sub-request
+                    await run_in_threadpool(db.rollback)
+        return BatchResponse(responses=responses, rolled_back=failed)
+    finally:
+        await run_in_threadpool(db.close)
+        if batch_in.atomic:
+            await run_in_threadpool(db.bind.close)
@@ -1,40 +1,73 @@
 from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from sqlalchemy.orm import Session, undefer
+from app.core import cache
+from app.core.dependencies import get_current_user, get_shard_db
 from app.models.daily_log import DailyLog as DailyLogModel
 from app.models.user import User as UserModel
-from app.schemas.daily_log import DailyLog as DailyLogSchema, DailyLogCreate, DailyLogUpdate
+from app.schemas.daily_log import DailyLog as DailyLogSchema, DailyLogCreate, DailyLogSummary, DailyLogUpdate
+from app.services import archive, reads
 from datetime import datetime
 
 router = APIRouter()
 
-@router.get("/", response_model=List[DailyLogSchema])
+def _invalidate(user_id: int, target_date) -> None:
+    cache.invalidate(user_id, ["logs"])
+    cache.invalidate(user_id, ["log"], {"date": target_date.isoformat()})
+
+@router.get("/", response_model=List[DailyLogSummary])
 def read_logs(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_shard_db),
     current_user: UserModel = Depends(get_current_user),
 ) -> Any:
-    return db.query(DailyLogModel).filter(DailyLogModel.user_id == current_user.id).all()
+    return cache.cached(
+        current_user.id, "logs", None,
+        lambda: reads.list_logs(db, current_user.id) + archive.archived_log_previews(db, current_user.id),
+        List[DailyLogSummary],
+    )
 
 @router.get("/{date}", response_model=Optional[DailyLogSchema])
 def get_log_by_date(
     date: str, # ISO Format YYYY-MM-DD
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_shard_db),
     current_user: UserModel = Depends(get_current_user),
 ) -> Any:
     target_date = datetime.strptime(date, "%Y-%m-%d").date()
-    log = db.query(DailyLogModel).filter(
+
+    def load():
+        log = db.query(DailyLogModel).options(undefer(DailyLogModel.body)).filter(
+            DailyLogModel.user_id == current_user.id,
+            DailyLogModel.date >= datetime.combine(target_date, datetime.min.time()),
+            DailyLogModel.date <= datetime.combine(target_date, datetime.max.time()),
+        ).first()
+        if log is None:
+            log = archive.find_archived_log(db, current_user.id, target_date)
+        return log
+
+    return cache.cached(
+        current_user.id, "log", {"date": target_date.isoformat()}, load, Optional[DailyLogSchema]
+    )
+
+@router.get("/entries/{log_id}", response_model=DailyLogSchema)
+def get_log_entry(
+    log_id: int,
+    db: Session = Depends(get_shard_db),
+    current_user: UserModel = Depends(get_current_user),
+) -> Any:
+    log = db.query(DailyLogModel).options(undefer(DailyLogModel.body)).filter(
+        DailyLogModel.id == log_id,
         DailyLogModel.user_id == current_user.id,
-        DailyLogModel.date >= datetime.combine(target_date, datetime.min.time()),
-        DailyLogModel.date <= datetime.combine(target_date, datetime.max.time()),
     ).first()
+    if log is None:
+        log = archive.find_archived_log_by_id(db, current_user.id, log_id)
+    if log is None:
+        raise HTTPException(status_code=404, detail="Log not found")
     return log
 
 @router.post("/", response_model=DailyLogSchema)
 def create_or_update_log(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_shard_db),
     log_in: DailyLogCreate,
     current_user: UserModel = Depends(get_current_user),
 ) -> Any:
@@ -53,10 +86,14 @@ def create_or_update_log(
         db.add(existing)
         db.commit()
         db.refresh(existing)
+        _invalidate(current_user.id, target_date)
         return existing
     else:
+        # Editing an archived day moves it back into the hot table
+        archive.pop_archived_log(db, current_user.id, target_date)
         log = DailyLogModel(**log_in.dict(), user_id=current_user.id)
         db.add(log)
         db.commit()
         db.refresh(log)
+        _invalidate(current_user.id, target_date)
         return log
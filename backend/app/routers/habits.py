@@ -1,30 +1,34 @@
-from typing import Any, List
+from typing import Any, List, Optional
 from fastapi import APIRouter, Depends, HTTPException, status
 from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core import cache
+from app.core.dependencies import get_current_user, get_shard_db
 from app.models.habit import Habit as HabitModel
 from app.models.habit_completion import HabitCompletion as HabitCompletionModel
 from app.models.user import User as UserModel
 from app.schemas.habit import Habit as HabitSchema, HabitCreate, HabitCompletionSchema
-from datetime import datetime
+from app.services import archive, reads
+from datetime import date, datetime
 
 router = APIRouter()
 
 @router.get("/", response_model=List[HabitSchema])
 def read_habits(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_shard_db),
     current_user: UserModel = Depends(get_current_user),
     skip: int = 0,
     limit: int = 100,
 ) -> Any:
-    habits = db.query(HabitModel).filter(HabitModel.user_id == current_user.id).offset(skip).limit(limit).all()
-    return habits
+    return cache.cached(
+        current_user.id, "habits", {"skip": skip, "limit": limit},
+        lambda: reads.list_habits(db, current_user.id, skip=skip, limit=limit),
+        List[HabitSchema],
+    )
 
 @router.post("/", response_model=HabitSchema)
 def create_habit(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_shard_db),
     habit_in: HabitCreate,
     current_user: UserModel = Depends(get_current_user),
 ) -> Any:
@@ -32,12 +36,13 @@ def create_habit(
     db.add(habit)
     db.commit()
     db.refresh(habit)
+    cache.invalidate(current_user.id, ["habits"])
     return habit
 
 @router.delete("/{id}", response_model=HabitSchema)
 def delete_habit(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_shard_db),
     id: int,
     current_user: UserModel = Depends(get_current_user),
 ) -> Any:
@@ -47,16 +52,18 @@ def delete_habit(
     
     # Also delete completions
     db.query(HabitCompletionModel).filter(HabitCompletionModel.habit_id == id).delete()
+    archive.drop_archived_habit(db, current_user.id, id)
     
     db.delete(habit)
     db.commit()
+    cache.invalidate(current_user.id, ["habits", "completions"])
     return habit
 
 # Completion Routes
 @router.post("/{id}/toggle", response_model=List[HabitCompletionSchema])
 def toggle_habit_completion(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_shard_db),
     id: int,
     date: str, # ISO Format YYYY-MM-DD
     current_user: UserModel = Depends(get_current_user),
@@ -76,19 +83,36 @@ def toggle_habit_completion(
     
     if existing:
         db.delete(existing)
-    else:
+    elif not archive.pop_archived_completion(db, current_user.id, id, target_date):
         new_completion = HabitCompletionModel(habit_id=id, completed_at=datetime.combine(target_date, datetime.now().time()))
         db.add(new_completion)
     
     db.commit()
+    cache.invalidate(current_user.id, ["completions"])
     
-    # Return all completions for this habit to update frontend
+    # Return this habit's hot completions to update frontend; archived months are
+    # only read on request, see get_all_completions
     return db.query(HabitCompletionModel).filter(HabitCompletionModel.habit_id == id).all()
 
 @router.get("/completions", response_model=List[HabitCompletionSchema])
 def get_all_completions(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_shard_db),
     current_user: UserModel = Depends(get_current_user),
+    start: Optional[date] = None,
+    end: Optional[date] = None,
 ) -> Any:
-    # Get all completions for all habits of this user
-    return db.query(HabitCompletionModel).join(HabitModel).filter(HabitModel.user_id == current_user.id).all()
+    """Completions for all of the user's habits.
+
+    Without a range only the hot tables are read (the last ARCHIVE_AFTER_MONTHS
+    months). With start and/or end, completions in that range are returned,
+    including archived months that overlap it.
+    """
+    def load():
+        completions = reads.list_completions(db, current_user.id, start=start, end=end)
+        if start is None and end is None:
+            return completions
+        return completions + archive.archived_completions(db, current_user.id, start=start, end=end)
+
+    return cache.cached(
+        current_user.id, "completions", {"start": start, "end": end}, load, List[HabitCompletionSchema],
+    )
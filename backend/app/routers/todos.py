@@ -1,25 +1,66 @@
-from typing import Any, List
-from fastapi import APIRouter, Depends, HTTPException
+from datetime import datetime
+from typing import Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from app.core.database import get_db
-from app.core.dependencies import get_current_user
+from app.core import cache
+from app.core.dependencies import get_current_user, get_shard_db
 from app.models.todo import Todo as TodoModel
 from app.models.user import User as UserModel
-from app.schemas.todo import Todo as TodoSchema, TodoCreate, TodoUpdate
+from app.schemas.todo import Todo as TodoSchema, TodoCounts, TodoCreate, TodoUpdate
+from app.services import reads
 
 router = APIRouter()
 
 @router.get("/", response_model=List[TodoSchema])
 def read_todos(
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_shard_db),
     current_user: UserModel = Depends(get_current_user),
+    status: Optional[List[str]] = Query(None),
+    priority: Optional[List[str]] = Query(None),
+    is_completed: Optional[bool] = None,
+    due_from: Optional[datetime] = None,
+    due_to: Optional[datetime] = None,
+    overdue: bool = False,
+    sort: Optional[str] = None, # created_at, due_date, priority or title; "-" prefix for descending
 ) -> Any:
-    return db.query(TodoModel).filter(TodoModel.user_id == current_user.id).all()
+    if sort and sort.lstrip("-") not in reads.TODO_SORTS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"sort must be one of: {', '.join(reads.TODO_SORTS)} (prefix with - for descending)",
+        )
+    filters = {
+        "status": sorted(status) if status else None,
+        "priority": sorted(priority) if priority else None,
+        "is_completed": is_completed,
+        "due_from": due_from,
+        "due_to": due_to,
+        "overdue": overdue,
+        "sort": sort,
+    }
+    # Overdue depends on the current time, so it is never cached
+    if overdue:
+        return reads.list_todos(db, current_user.id, **filters)
+    return cache.cached(
+        current_user.id, "todos", filters,
+        lambda: reads.list_todos(db, current_user.id, **filters),
+        List[TodoSchema],
+    )
+
+@router.get("/counts", response_model=TodoCounts)
+def count_todos(
+    db: Session = Depends(get_shard_db),
+    current_user: UserModel = Depends(get_current_user),
+) -> Any:
+    return cache.cached(
+        current_user.id, "todo_counts", None,
+        lambda: reads.count_todos(db, current_user.id),
+        TodoCounts,
+    )
 
 @router.post("/", response_model=TodoSchema)
 def create_todo(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_shard_db),
     todo_in: TodoCreate,
     current_user: UserModel = Depends(get_current_user),
 ) -> Any:
@@ -27,12 +68,13 @@ def create_todo(
     db.add(todo)
     db.commit()
     db.refresh(todo)
+    cache.invalidate(current_user.id, ["todos", "todo_counts"])
     return todo
 
 @router.patch("/{id}", response_model=TodoSchema)
 def update_todo(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_shard_db),
     id: int,
     todo_in: TodoUpdate,
     current_user: UserModel = Depends(get_current_user),
@@ -48,12 +90,13 @@ def update_todo(
     db.add(todo)
     db.commit()
     db.refresh(todo)
+    cache.invalidate(current_user.id, ["todos", "todo_counts"])
     return todo
 
 @router.delete("/{id}", response_model=TodoSchema)
 def delete_todo(
     *,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_shard_db),
     id: int,
     current_user: UserModel = Depends(get_current_user),
 ) -> Any:
@@ -62,4 +105,5 @@ def delete_todo(
         raise HTTPException(status_code=404, detail="Todo not found")
     db.delete(todo)
     db.commit()
+    cache.invalidate(current_user.id, ["todos", "todo_counts"])
     return todo
@@ -0,0 +1,19 @@
+from pydantic import BaseModel
+from typing import Any, List, Optional
+
+class SubRequest(BaseModel):
+    method: str = "GET"
+    path: str  # e.g. "/habits/3/toggle?date=2026-01-31"
+    body: Optional[Any] = None
+
+class BatchRequest(BaseModel):
+    requests: List[SubRequest]
+    atomic: bool = False  # run everything in one transaction, stop at the first error
+
+class SubResponse(BaseModel):
+    status: int
+    body: Optional[Any] = None
+
+class BatchResponse(BaseModel):
+    responses: List[SubResponse]
+    rolled_back: bool = False
@@ -20,3 +20,14 @@ class DailyLog(DailyLogBase):
 
     class Config:
         from_attributes = True
+
+class DailyLogSummary(BaseModel):
+    """List view entry: the start of the log instead of its full content."""
+    id: int
+    user_id: int
+    date: datetime
+    preview: Optional[str] = None
+    mood: Optional[str] = None
+
+    class Config:
+        from_attributes = True
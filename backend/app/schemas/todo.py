@@ -1,6 +1,6 @@
-from pydantic import BaseModel
+from pydantic import BaseModel, field_validator
 from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 
 class TodoBase(BaseModel):
     title: str
@@ -19,6 +19,14 @@ class TodoUpdate(BaseModel):
     status: Optional[str] = None
     due_date: Optional[datetime] = None
 
+    @field_validator("is_completed", "priority", "status")
+    @classmethod
+    def not_null(cls, value):
+        # Leave the field out to keep it; the columns are NOT NULL
+        if value is None:
+            raise ValueError("may be omitted but not null")
+        return value
+
 class Todo(TodoBase):
     id: int
     user_id: int
@@ -26,3 +34,8 @@ class Todo(TodoBase):
 
     class Config:
         from_attributes = True
+
+class TodoCounts(BaseModel):
+    total: int
+    by_status: Dict[str, int]
+    by_priority: Dict[str, int]
@@ -0,0 +1,159 @@
+"""Cold tier for habit completions and daily logs.
+
+Months older than ARCHIVE_AFTER_MONTHS are compacted out of the hot tables into
+one row per user and month (see app.services.partitions). The helpers here let
+the routers read and modify that history as if it were still in the hot tables.
+
+Payloads are zlib-compressed JSON lists:
+    completions:   [[id, habit_id, completed_at], ...]
+    logs:          [[id, date, content, mood], ...]
+    log previews:  [[id, date, preview, mood], ...]
+
+Log archives keep the previews separately, so listing a user's logs never
+reads or decompresses the full entries.
+"""
+import json
+import zlib
+from collections import namedtuple
+from datetime import date, datetime
+from typing import Callable, Dict, List, Optional
+from sqlalchemy.orm import Session
+from app.models.daily_log import make_preview
+from app.models.daily_log_archive import DailyLogArchive
+from app.models.habit_completion_archive import HabitCompletionArchive
+
+ArchivedCompletion = namedtuple("ArchivedCompletion", ["id", "habit_id", "completed_at"])
+ArchivedLog = namedtuple("ArchivedLog", ["id", "user_id", "date", "content", "mood", "preview"])
+ArchivedLogSummary = namedtuple("ArchivedLogSummary", ["id", "user_id", "date", "preview", "mood"])
+
+def pack(entries: list) -> bytes:
+    return zlib.compress(json.dumps(entries, separators=(",", ":")).encode(), 9)
+
+def unpack(payload: bytes) -> list:
+    return json.loads(zlib.decompress(payload))
+
+def month_of(value) -> date:
+    return date(value.year, value.month, 1)
+
+def _store(archive, entries: list) -> None:
+    archive.payload = pack(entries)
+    if isinstance(archive, DailyLogArchive):
+        archive.previews = pack([[e[0], e[1], make_preview(e[2]), e[3]] for e in entries])
+
+def merge(db: Session, model, user_id: int, month: date, entries: list) -> None:
+    """Append entries to a user's archive row for month, creating it if needed."""
+    archive = db.query(model).filter(model.user_id == user_id, model.month == month).first()
+    if archive:
+        _store(archive, unpack(archive.payload) + entries)
+    else:
+        archive = model(user_id=user_id, month=month)
+        _store(archive, entries)
+        db.add(archive)
+
+def _remove(db: Session, archives: list, drop: Callable[[list], bool]) -> list:
+    removed = []
+    for archive in archives:
+        entries = unpack(archive.payload)
+        kept = [e for e in entries if not drop(e)]
+        if len(kept) == len(entries):
+            continue
+        removed.extend(e for e in entries if drop(e))
+        if kept:
+            _store(archive, kept)
+        else:
+            db.delete(archive)
+    return removed
+
+# Completions
+
+def _completion(entry: list) -> ArchivedCompletion:
+    return ArchivedCompletion(entry[0], entry[1], datetime.fromisoformat(entry[2]))
+
+def archived_completions(
+    db: Session,
+    user_id: int,
+    habit_id: Optional[int] = None,
+    start: Optional[date] = None,
+    end: Optional[date] = None,
+) -> List[ArchivedCompletion]:
+    """Archived completions, optionally limited to habit_id and the days start..end.
+
+    Only the archive rows of months overlapping the range are read.
+    """
+    query = db.query(HabitCompletionArchive.payload).filter(HabitCompletionArchive.user_id == user_id)
+    if start is not None:
+        query = query.filter(HabitCompletionArchive.month >= month_of(start))
+    if end is not None:
+        query = query.filter(HabitCompletionArchive.month <= month_of(end))
+    completions = [_completion(entry) for (payload,) in query.all() for entry in unpack(payload)]
+    return [
+        c for c in completions
+        if (habit_id is None or c.habit_id == habit_id)
+        and (start is None or c.completed_at.date() >= start)
+        and (end is None or c.completed_at.date() <= end)
+    ]
+
+def pop_archived_completion(db: Session, user_id: int, habit_id: int, day: date) -> bool:
+    """Remove an archived completion of habit_id on day. Returns True if one existed."""
+    archives = db.query(HabitCompletionArchive).filter(
+        HabitCompletionArchive.user_id == user_id,
+        HabitCompletionArchive.month == month_of(day),
+    ).all()
+    removed = _remove(db, archives, lambda e: e[1] == habit_id and e[2][:10] == day.isoformat())
+    return bool(removed)
+
+def drop_archived_habit(db: Session, user_id: int, habit_id: int) -> None:
+    archives = db.query(HabitCompletionArchive).filter(HabitCompletionArchive.user_id == user_id).all()
+    _remove(db, archives, lambda e: e[1] == habit_id)
+
+# Logs
+
+def _log(user_id: int, entry: list) -> ArchivedLog:
+    return ArchivedLog(entry[0], user_id, datetime.fromisoformat(entry[1]), entry[2], entry[3], make_preview(entry[2]))
+
+def archived_logs(db: Session, user_id: int) -> List[ArchivedLog]:
+    payloads = db.query(DailyLogArchive.payload).filter(DailyLogArchive.user_id == user_id).all()
+    return [_log(user_id, entry) for (payload,) in payloads for entry in unpack(payload)]
+
+def archived_log_previews(db: Session, user_id: int) -> List[ArchivedLogSummary]:
+    """Archived logs without their full text, for list views."""
+    previews = db.query(DailyLogArchive.previews).filter(DailyLogArchive.user_id == user_id).all()
+    return [
+        ArchivedLogSummary(entry[0], user_id, datetime.fromisoformat(entry[1]), entry[2], entry[3])
+        for (payload,) in previews
+        for entry in unpack(payload)
+    ]
+
+def find_archived_log(db: Session, user_id: int, day: date) -> Optional[ArchivedLog]:
+    archive = db.query(DailyLogArchive).filter(
+        DailyLogArchive.user_id == user_id,
+        DailyLogArchive.month == month_of(day),
+    ).first()
+    if archive is None:
+        return None
+    for entry in unpack(archive.payload):
+        if entry[1][:10] == day.isoformat():
+            return _log(user_id, entry)
+    return None
+
+def find_archived_log_by_id(db: Session, user_id: int, log_id: int) -> Optional[ArchivedLog]:
+    # Locate the day in the previews, then unpack only that month's full entries
+    for summary in archived_log_previews(db, user_id):
+        if summary.id == log_id:
+            return find_archived_log(db, user_id, summary.date.date())
+    return None
+
+def pop_archived_log(db: Session, user_id: int, day: date) -> Optional[ArchivedLog]:
+    """Remove and return the archived log for day, so it can be edited in the hot table."""
+    archives = db.query(DailyLogArchive).filter(
+        DailyLogArchive.user_id == user_id,
+        DailyLogArchive.month == month_of(day),
+    ).all()
+    removed = _remove(db, archives, lambda e: e[1][:10] == day.isoformat())
+    return _log(user_id, removed[0]) if removed else None
+
+def group_by_user_month(rows, user_key: Callable, date_key: Callable, entry: Callable) -> Dict[tuple, list]:
+    grouped: Dict[tuple, list] = {}
+    for row in rows:
+        grouped.setdefault((user_key(row), month_of(date_key(row))), []).append(entry(row))
+    return grouped
@@ -0,0 +1,157 @@
+"""Monthly partition management for habit_completions and daily_logs (Postgres).
+
+Keeps PARTITION_MONTHS_AHEAD future partitions in place and compacts partitions
+older than ARCHIVE_AFTER_MONTHS into the archive tables, then drops them, so the
+hot tables and their indexes only hold recent history.
+
+Usage (from backend/):
+    python -m app.services.partitions
+"""
+import logging
+import re
+from datetime import date
+from sqlalchemy import text
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import shard_engines
+from app.models.daily_log import decompress_content
+from app.models.daily_log_archive import DailyLogArchive
+from app.models.habit_completion_archive import HabitCompletionArchive
+from app.services import archive
+
+logger = logging.getLogger(__name__)
+
+# Arbitrary key so only one worker maintains a database at a time
+ADVISORY_LOCK_KEY = 727_001
+
+PARTITION_NAME = re.compile(r"_p(\d{4})_(\d{2})$")
+
+def _add_months(month: date, months: int) -> date:
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+# Partitioned table -> partition key column
+PARTITION_KEYS = {"habit_completions": "completed_at", "daily_logs": "date"}
+
+def _create_partition(db: Session, table: str, month: date) -> None:
+    """Create table's partition for month, taking over its rows from the default partition.
+
+    Clients may write rows for any date, so the default partition can already
+    hold rows for month; attaching a partition over them would fail. The new
+    table is filled with those rows first and attached afterwards, all inside
+    the caller's transaction.
+    """
+    name = f"{table}_p{month:%Y_%m}"
+    if db.execute(text("SELECT to_regclass(:name)"), {"name": name}).scalar() is not None:
+        return
+    key = PARTITION_KEYS[table]
+    bounds = {"start": month, "end": _add_months(month, 1)}
+    columns = ", ".join(db.execute(text(
+        "SELECT column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema() AND table_name = :table ORDER BY ordinal_position"
+    ), {"table": table}).scalars().all())
+
+    db.execute(text(f"CREATE TABLE {name} (LIKE {table} INCLUDING DEFAULTS INCLUDING CONSTRAINTS)"))
+    db.execute(text(
+        f"WITH moved AS (DELETE FROM {table}_default WHERE {key} >= :start AND {key} < :end "
+        f"RETURNING {columns}) INSERT INTO {name} ({columns}) SELECT {columns} FROM moved"
+    ), bounds)
+    db.execute(text(
+        f"ALTER TABLE {table} ATTACH PARTITION {name} "
+        f"FOR VALUES FROM ('{bounds['start'].isoformat()}') TO ('{bounds['end'].isoformat()}')"
+    ))
+
+def ensure_partitions(db: Session, months_ahead: int) -> None:
+    current = archive.month_of(date.today())
+    for table in PARTITION_KEYS:
+        for offset in range(months_ahead + 1):
+            _create_partition(db, table, _add_months(current, offset))
+
+def _partitions(db: Session, table: str):
+    names = db.execute(text(
+        "SELECT c.relname FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent "
+        "WHERE p.relname = :table"
+    ), {"table": table}).scalars().all()
+    for name in names:
+        match = PARTITION_NAME.search(name)
+        if match:
+            yield name, date(int(match.group(1)), int(match.group(2)), 1)
+
+def _archive_completions(db: Session, rows) -> None:
+    grouped = archive.group_by_user_month(
+        rows,
+        user_key=lambda r: r.user_id,
+        date_key=lambda r: r.completed_at,
+        entry=lambda r: [r.id, r.habit_id, r.completed_at.isoformat()],
+    )
+    for (user_id, month), entries in grouped.items():
+        archive.merge(db, HabitCompletionArchive, user_id, month, entries)
+
+def _archive_logs(db: Session, rows) -> None:
+    grouped = archive.group_by_user_month(
+        rows,
+        user_key=lambda r: r.user_id,
+        date_key=lambda r: r.date,
+        entry=lambda r: [r.id, r.date.isoformat(), decompress_content(r.body), r.mood],
+    )
+    for (user_id, month), entries in grouped.items():
+        archive.merge(db, DailyLogArchive, user_id, month, entries)
+
+def archive_cold_partitions(db: Session, archive_after_months: int) -> None:
+    cutoff = _add_months(archive.month_of(date.today()), -archive_after_months)
+
+    for name, month in _partitions(db, "habit_completions"):
+        if month >= cutoff:
+            continue
+        rows = db.execute(text(
+            f"SELECT c.id, c.habit_id, c.completed_at, h.user_id FROM {name} c "
+            f"JOIN habits h ON h.id = c.habit_id"
+        )).all()
+        _archive_completions(db, rows)
+        db.execute(text(f"ALTER TABLE habit_completions DETACH PARTITION {name}"))
+        db.execute(text(f"DROP TABLE {name}"))
+        logger.info(f"Archived partition {name} ({len(rows)} rows).")
+
+    for name, month in _partitions(db, "daily_logs"):
+        if month >= cutoff:
+            continue
+        rows = db.execute(text(f"SELECT id, user_id, date, body, mood FROM {name}")).all()
+        _archive_logs(db, rows)
+        db.execute(text(f"ALTER TABLE daily_logs DETACH PARTITION {name}"))
+        db.execute(text(f"DROP TABLE {name}"))
+        logger.info(f"Archived partition {name} ({len(rows)} rows).")
+
+    # Rows written for already-archived months land in the default partitions
+    rows = db.execute(text(
+        "DELETE FROM habit_completions_default c USING habits h "
+        "WHERE h.id = c.habit_id AND c.completed_at < :cutoff "
+        "RETURNING c.id, c.habit_id, c.completed_at, h.user_id"
+    ), {"cutoff": cutoff}).all()
+    _archive_completions(db, rows)
+    rows = db.execute(text(
+        "DELETE FROM daily_logs_default WHERE date < :cutoff "
+        "RETURNING id, user_id, date, body, mood"
+    ), {"cutoff": cutoff}).all()
+    _archive_logs(db, rows)
+
+def maintain(engine) -> None:
+    """Create upcoming partitions and archive cold ones on one database."""
+    if engine.dialect.name != "postgresql":
+        return
+    with Session(bind=engine) as db:
+        locked = db.execute(text("SELECT pg_try_advisory_xact_lock(:key)"), {"key": ADVISORY_LOCK_KEY}).scalar()
+        if not locked:
+            return
+        ensure_partitions(db, settings.PARTITION_MONTHS_AHEAD)
+        archive_cold_partitions(db, settings.ARCHIVE_AFTER_MONTHS)
+        db.commit()
+
+def maintain_all() -> None:
+    for engine in shard_engines:
+        maintain(engine)
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    maintain_all()
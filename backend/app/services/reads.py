@@ -0,0 +1,104 @@
+"""Read-only list queries on SQLAlchemy Core.
+
+These return lightweight Row objects (named tuples) holding only the columns the
+response schemas need, skipping ORM entity construction, identity-map tracking
+and relationship instrumentation. Use them for endpoints that only serialize.
+"""
+from datetime import date, datetime, time
+from typing import Dict, List, Optional
+from sqlalchemy import case, func, select
+from sqlalchemy.engine import Row
+from sqlalchemy.orm import Session
+from app.models.daily_log import DailyLog
+from app.models.habit import Habit
+from app.models.habit_completion import HabitCompletion
+from app.models.todo import Todo
+
+todos = Todo.__table__
+habits = Habit.__table__
+completions = HabitCompletion.__table__
+daily_logs = DailyLog.__table__
+
+PRIORITY_RANK = case({"high": 0, "medium": 1, "low": 2}, value=todos.c.priority, else_=3)
+
+# Accepted values of the `sort` parameter; a leading "-" sorts descending
+TODO_SORTS = {
+    "created_at": todos.c.created_at,
+    "due_date": todos.c.due_date,
+    "priority": PRIORITY_RANK,
+    "title": todos.c.title,
+}
+
+def list_todos(
+    db: Session,
+    user_id: int,
+    status: Optional[List[str]] = None,
+    priority: Optional[List[str]] = None,
+    is_completed: Optional[bool] = None,
+    due_from: Optional[datetime] = None,
+    due_to: Optional[datetime] = None,
+    overdue: bool = False,
+    sort: Optional[str] = None,
+) -> List[Row]:
+    query = select(
+        todos.c.id, todos.c.user_id, todos.c.title, todos.c.is_completed,
+        todos.c.created_at, todos.c.priority, todos.c.status, todos.c.due_date,
+    ).where(todos.c.user_id == user_id)
+    if status:
+        query = query.where(todos.c.status.in_(status))
+    if priority:
+        query = query.where(todos.c.priority.in_(priority))
+    if is_completed is not None:
+        query = query.where(todos.c.is_completed == is_completed)
+    if due_from is not None:
+        query = query.where(todos.c.due_date >= due_from)
+    if due_to is not None:
+        query = query.where(todos.c.due_date <= due_to)
+    if overdue:
+        query = query.where(
+            todos.c.due_date < datetime.utcnow(),
+            todos.c.status != "done",
+            todos.c.is_completed.is_(False),
+        )
+    if sort:
+        column = TODO_SORTS[sort.lstrip("-")]
+        query = query.order_by(column.desc() if sort.startswith("-") else column.asc(), todos.c.id)
+    return db.execute(query).all()
+
+def count_todos(db: Session, user_id: int) -> Dict[str, object]:
+    """Todo counts per status and per priority from one grouped query."""
+    query = select(
+        todos.c.status, todos.c.priority, func.count(),
+    ).where(todos.c.user_id == user_id).group_by(todos.c.status, todos.c.priority)
+    by_status: Dict[str, int] = {}
+    by_priority: Dict[str, int] = {}
+    total = 0
+    for status, priority, count in db.execute(query):
+        by_status[status] = by_status.get(status, 0) + count
+        by_priority[priority] = by_priority.get(priority, 0) + count
+        total += count
+    return {"total": total, "by_status": by_status, "by_priority": by_priority}
+
+def list_habits(db: Session, user_id: int, skip: int = 0, limit: int = 100) -> List[Row]:
+    query = select(
+        habits.c.id, habits.c.user_id, habits.c.name, habits.c.description, habits.c.created_at,
+    ).where(habits.c.user_id == user_id).offset(skip).limit(limit)
+    return db.execute(query).all()
+
+def list_completions(
+    db: Session, user_id: int, start: Optional[date] = None, end: Optional[date] = None,
+) -> List[Row]:
+    query = select(
+        completions.c.id, completions.c.habit_id, completions.c.completed_at,
+    ).join(habits, habits.c.id == completions.c.habit_id).where(habits.c.user_id == user_id)
+    if start is not None:
+        query = query.where(completions.c.completed_at >= datetime.combine(start, time.min))
+    if end is not None:
+        query = query.where(completions.c.completed_at <= datetime.combine(end, time.max))
+    return db.execute(query).all()
+
+def list_logs(db: Session, user_id: int) -> List[Row]:
+    query = select(
+        daily_logs.c.id, daily_logs.c.user_id, daily_logs.c.date, daily_logs.c.preview, daily_logs.c.mood,
+    ).where(daily_logs.c.user_id == user_id)
+    return db.execute(query).all()
@@ -0,0 +1,173 @@
+"""Shard maintenance: per-shard migrations and moving users between shards.
+
+Usage (from backend/):
+    python -m app.services.shards migrate
+    python -m app.services.shards move <user_id> <target_shard>
+"""
+import argparse
+import logging
+import time
+from alembic import command
+from alembic.config import Config
+from sqlalchemy.orm import undefer
+from app.core import cache
+from app.core.config import settings
+from app.core.database import SessionLocal, shard_count, shard_session
+from app.models.daily_log import DailyLog
+from app.models.daily_log_archive import DailyLogArchive
+from app.models.habit import Habit
+from app.models.habit_completion import HabitCompletion
+from app.models.habit_completion_archive import HabitCompletionArchive
+from app.models.todo import Todo
+from app.models.user import User
+from app.models.user_directory import UserDirectory
+from app.services import archive
+
+logger = logging.getLogger(__name__)
+
+def migrate_all(config_path: str = "alembic.ini") -> None:
+    """Upgrade the directory database and every shard to head."""
+    alembic_cfg = Config(config_path)
+    command.upgrade(alembic_cfg, "head")
+    for shard_id, url in enumerate(settings.shard_urls):
+        if url == settings.DATABASE_URL:
+            continue
+        shard_cfg = Config(config_path)
+        shard_cfg.attributes["shard"] = shard_id
+        command.upgrade(shard_cfg, "head")
+        logger.info(f"Shard {shard_id} migrated.")
+
+def _copy(obj, **overrides):
+    """Detached copy of an ORM row without its primary key."""
+    values = {
+        c.key: getattr(obj, c.key)
+        for c in obj.__mapper__.column_attrs
+        if c.key != "id"
+    }
+    values.update(overrides)
+    return type(obj)(**values)
+
+def _delete_user_data(db, user_id: int) -> None:
+    """Delete every row of user_id from one shard, without committing."""
+    habit_ids = db.query(Habit.id).filter(Habit.user_id == user_id)
+    db.query(HabitCompletion).filter(
+        HabitCompletion.habit_id.in_(habit_ids.scalar_subquery())
+    ).delete(synchronize_session=False)
+    for model in (HabitCompletionArchive, DailyLogArchive, Habit, Todo, DailyLog):
+        db.query(model).filter(model.user_id == user_id).delete(synchronize_session=False)
+    db.query(User).filter(User.id == user_id).delete(synchronize_session=False)
+
+def move_user(user_id: int, target_shard: int, drain_seconds: float = 2.0) -> None:
+    """Move all of a user's data to target_shard while the app keeps serving.
+
+    The directory entry is flagged first, so the user's requests get a 503 with
+    Retry-After instead of writing to the old shard mid-copy. Other users are not
+    affected. Habit, todo and log ids are reassigned on the target shard.
+    """
+    if not 0 <= target_shard < shard_count():
+        raise ValueError(f"Unknown shard {target_shard}")
+
+    directory = SessionLocal()
+    try:
+        entry = directory.query(UserDirectory).filter(UserDirectory.id == user_id).first()
+        if entry is None:
+            raise ValueError(f"Unknown user {user_id}")
+        if entry.shard_id == target_shard:
+            return
+        source_shard = entry.shard_id
+        entry.is_moving = True
+        directory.commit()
+
+        # Let requests that resolved the old shard before the flag finish
+        time.sleep(drain_seconds)
+
+        source = shard_session(source_shard)
+        target = shard_session(target_shard)
+        try:
+            user = source.query(User).filter(User.id == user_id).first()
+            if user is None:
+                raise ValueError(f"User {user_id} is missing from shard {source_shard}")
+            # A copy left by an earlier attempt that failed after committing the target
+            _delete_user_data(target, user_id)
+            target.add(_copy(user, id=user.id))
+
+            habits = source.query(Habit).filter(Habit.user_id == user_id).all()
+            habit_ids = {}
+            for habit in habits:
+                new_habit = _copy(habit)
+                target.add(new_habit)
+                target.flush()
+                habit_ids[habit.id] = new_habit.id
+
+            if habit_ids:
+                completions = source.query(HabitCompletion).filter(
+                    HabitCompletion.habit_id.in_(habit_ids.keys())
+                ).all()
+                for completion in completions:
+                    target.add(_copy(completion, habit_id=habit_ids[completion.habit_id]))
+
+            for row in source.query(Todo).filter(Todo.user_id == user_id).all():
+                target.add(_copy(row))
+            logs = source.query(DailyLog).options(undefer(DailyLog.body)).filter(DailyLog.user_id == user_id)
+            for row in logs.all():
+                target.add(_copy(row))
+
+            # Archived months come back as hot rows; the next partition maintenance
+            # run on the target shard archives them again
+            for completion in archive.archived_completions(source, user_id):
+                if completion.habit_id in habit_ids:
+                    target.add(HabitCompletion(
+                        habit_id=habit_ids[completion.habit_id],
+                        completed_at=completion.completed_at,
+                    ))
+            for log in archive.archived_logs(source, user_id):
+                target.add(DailyLog(user_id=user_id, date=log.date, content=log.content, mood=log.mood))
+
+            target.commit()
+
+            entry.shard_id = target_shard
+            entry.is_moving = False
+            directory.commit()
+        except Exception:
+            target.rollback()
+            # The directory still points at the source; drop a copy that was committed
+            _delete_user_data(target, user_id)
+            target.commit()
+            directory.rollback()
+            entry.is_moving = False
+            directory.commit()
+            raise
+        finally:
+            target.close()
+
+        # Ids were reassigned on the target shard
+        cache.invalidate_user(user_id)
+
+        # The directory now points at the target shard; drop the old copy
+        try:
+            _delete_user_data(source, user_id)
+            source.commit()
+        finally:
+            source.close()
+        logger.info(f"Moved user {user_id} from shard {source_shard} to shard {target_shard}.")
+    finally:
+        directory.close()
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Shard maintenance")
+    sub = parser.add_subparsers(dest="command", required=True)
+    sub.add_parser("migrate", help="Run Alembic migrations on the directory and every shard")
+    move = sub.add_parser("move", help="Move a user to another shard")
+    move.add_argument("user_id", type=int)
+    move.add_argument("target_shard", type=int)
+    move.add_argument("--drain-seconds", type=float, default=2.0)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    if args.command == "migrate":
+        migrate_all()
+    else:
+        move_user(args.user_id, args.target_shard, drain_seconds=args.drain_seconds)
+
+if __name__ == "__main__":
+    main()
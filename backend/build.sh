@@ -5,5 +5,8 @@ set -o errexit
 # Install dependencies
 pip install -r requirements.txt
 
-# Run migrations
-alembic upgrade head
+# Run migrations on the directory database and every shard
+python -m app.services.shards migrate
+
+# Create upcoming monthly partitions and archive cold ones
+python -m app.services.partitions
@@ -0,0 +1,110 @@
+"""Compare the ORM list path with the Core read layer in app.services.reads.
+
+For each list query this loads N rows both ways (ORM `db.query(...).all()` and
+the Core `select()` helper), serializes them through the response schema, and
+reports rows per second plus peak memory per 10k rows (tracemalloc).
+
+Usage (from backend/):
+    python scripts/benchmark_reads.py                     # in-memory SQLite
+    python scripts/benchmark_reads.py --url postgresql://... --rows 50000
+The target database is wiped with drop_all/create_all, so never point it at real data.
+"""
+import argparse
+import os
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+from typing import List
+
+sys.path.insert(0, os.path.realpath(os.path.join(os.path.dirname(__file__), "..")))
+
+from pydantic import TypeAdapter
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from app.core.database import Base
+from app.models import DailyLog, Habit, HabitCompletion, Todo, User
+from app.schemas.daily_log import DailyLogSummary
+from app.schemas.habit import Habit as HabitSchema, HabitCompletionSchema
+from app.schemas.todo import Todo as TodoSchema
+from app.services import reads
+
+def seed(db, rows: int) -> int:
+    user = User(email="bench@example.com", hashed_password="x")
+    db.add(user)
+    db.flush()
+    start = datetime(2025, 1, 1)
+    db.add_all(Todo(user_id=user.id, title=f"todo {i}", priority="high", due_date=start + timedelta(hours=i)) for i in range(rows))
+    db.add_all(Habit(user_id=user.id, name=f"habit {i}") for i in range(rows))
+    db.flush()
+    habit = db.query(Habit).filter(Habit.user_id == user.id).first()
+    db.add_all(HabitCompletion(habit_id=habit.id, completed_at=start + timedelta(minutes=i)) for i in range(rows))
+    db.add_all(DailyLog(user_id=user.id, date=start + timedelta(days=i), content="x" * 200, mood="ok") for i in range(rows))
+    db.commit()
+    return user.id
+
+def measure(session_factory, load, schema, repeat: int):
+    adapter = TypeAdapter(List[schema])
+
+    def run(db):
+        rows = load(db)
+        adapter.validate_python(rows, from_attributes=True)
+        return len(rows)
+
+    best = None
+    for _ in range(repeat):
+        with session_factory() as db:
+            began = time.perf_counter()
+            count = run(db)
+            elapsed = time.perf_counter() - began
+        best = elapsed if best is None else min(best, elapsed)
+
+    # Separate pass: tracemalloc slows allocation-heavy code down considerably
+    with session_factory() as db:
+        tracemalloc.start()
+        run(db)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return count / best, peak / count * 10_000 / 1024 / 1024
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="sqlite://")
+    parser.add_argument("--rows", type=int, default=10_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    if args.url.startswith("sqlite"):
+        engine = create_engine(args.url, connect_args={"check_same_thread": False}, poolclass=StaticPool)
+    else:
+        engine = create_engine(args.url)
+    Base.metadata.drop_all(engine)
+    Base.metadata.create_all(engine)
+    session_factory = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+    with session_factory() as db:
+        user_id = seed(db, args.rows)
+
+    cases = [
+        ("todos", TodoSchema,
+         lambda db: db.query(Todo).filter(Todo.user_id == user_id).all(),
+         lambda db: reads.list_todos(db, user_id)),
+        ("habits", HabitSchema,
+         lambda db: db.query(Habit).filter(Habit.user_id == user_id).limit(args.rows).all(),
+         lambda db: reads.list_habits(db, user_id, limit=args.rows)),
+        ("completions", HabitCompletionSchema,
+         lambda db: db.query(HabitCompletion).join(Habit).filter(Habit.user_id == user_id).all(),
+         lambda db: reads.list_completions(db, user_id)),
+        ("logs", DailyLogSummary,
+         lambda db: db.query(DailyLog).filter(DailyLog.user_id == user_id).all(),
+         lambda db: reads.list_logs(db, user_id)),
+    ]
+
+    print(f"{'query':<12} {'path':<5} {'rows/s':>12} {'MiB/10k rows':>13}")
+    for name, schema, orm_load, core_load in cases:
+        for path, load in (("orm", orm_load), ("core", core_load)):
+            rate, memory = measure(session_factory, load, schema, args.repeat)
+            print(f"{name:<12} {path:<5} {rate:>12,.0f} {memory:>13.2f}")
+
+if __name__ == "__main__":
+    main()
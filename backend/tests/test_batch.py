@@ -0,0 +1,57 @@
+"""POST /batch in atomic mode on SQLite (pysqlite savepoints, see app.core.database).
+
+Run from backend/ with `python -m pytest tests` (needs pytest and httpx).
+"""
+import os
+import tempfile
+
+_db_dir = tempfile.mkdtemp()
+os.environ["DATABASE_URL"] = f"sqlite:///{os.path.join(_db_dir, 'ordia-test.db')}"
+os.environ["SHARD_DATABASE_URLS"] = ""
+
+import pytest
+from fastapi.testclient import TestClient
+from app.core.database import Base, engine
+from app.main import app
+
+@pytest.fixture(scope="module")
+def client():
+    Base.metadata.create_all(engine)
+    # Not used as a context manager: startup would run the Postgres migrations
+    yield TestClient(app)
+    Base.metadata.drop_all(engine)
+
+@pytest.fixture(scope="module")
+def headers(client):
+    client.post("/auth/signup", json={"email": "batch@example.com", "password": "secret-password"})
+    response = client.post("/auth/login", data={"username": "batch@example.com", "password": "secret-password"})
+    return {"Authorization": f"Bearer {response.json()['access_token']}"}
+
+def test_failed_atomic_batch_leaves_no_writes(client, headers):
+    todo = client.post("/todos/", json={"title": "stay open"}, headers=headers).json()
+
+    response = client.post("/batch", headers=headers, json={
+        "atomic": True,
+        "requests": [
+            {"method": "PATCH", "path": f"/todos/{todo['id']}", "body": {"is_completed": True}},
+            {"method": "PATCH", "path": "/todos/999999", "body": {"is_completed": True}},
+        ],
+    })
+
+    assert response.status_code == 200
+    assert response.json()["rolled_back"] is True
+    assert [r["status"] for r in response.json()["responses"]] == [200, 404]
+    todos = client.get("/todos/", headers=headers).json()
+    assert [t["is_completed"] for t in todos if t["id"] == todo["id"]] == [False]
+
+def test_atomic_batch_commits_when_every_request_succeeds(client, headers):
+    todo = client.post("/todos/", json={"title": "close me"}, headers=headers).json()
+
+    response = client.post("/batch", headers=headers, json={
+        "atomic": True,
+        "requests": [{"method": "PATCH", "path": f"/todos/{todo['id']}", "body": {"is_completed": True}}],
+    })
+
+    assert response.json()["rolled_back"] is False
+    todos = client.get("/todos/", headers=headers).json()
+    assert [t["is_completed"] for t in todos if t["id"] == todo["id"]] == [True]
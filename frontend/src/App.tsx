@@ -8,7 +8,7 @@
  * - Progress visualization chart
  */
 
-import { useState } from "react";
+import { useState, useEffect } from "react";
 import { Header } from "./components/Header";
 import { MonthlyGoals } from "@/components/HabitGrid";
 import { DayLog } from "@/components/DayLog";
@@ -29,7 +29,9 @@ function App() {
     completions,
     toggleHabit,
     updateLog,
+    loadLog,
     getLog,
+    isLogLoaded,
     getTodos,
     addTodo,
     toggleTodo,
@@ -44,6 +46,10 @@ function App() {
   const [isAdvancedTodoOpen, setIsAdvancedTodoOpen] = useState(false);
   const [isLoading, setIsLoading] = useState(true);
 
+  useEffect(() => {
+    loadLog(selectedDate);
+  }, [loadLog, selectedDate]);
+
   const handleLogin = (newToken: string) => {
     localStorage.setItem("ordia_token", newToken);
     setToken(newToken);
@@ -104,6 +110,7 @@ function App() {
             <DayLog
               updateLog={updateLog}
               getLog={getLog}
+              isLogLoaded={isLogLoaded}
               /* We'll modify DayLog component to accept selectedDate for focusing, or we can leave it as "recent list" but highlighted. 
                  User said: "show the daily log for that date". 
                  Actually, let's just pass the date and let DayLog decide.
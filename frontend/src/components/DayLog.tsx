@@ -4,7 +4,7 @@
  * Shows entries for the past few days
  */
 
-import { useState } from "react";
+import { useState, useEffect } from "react";
 
 import { formatDate } from "@/lib/storage";
 import type { OrdiaaStateHook } from "@/hooks/useOrdiaState";
@@ -12,10 +12,11 @@ import type { OrdiaaStateHook } from "@/hooks/useOrdiaState";
 interface DayLogProps {
     updateLog: OrdiaaStateHook["updateLog"];
     getLog: OrdiaaStateHook["getLog"];
+    isLogLoaded: OrdiaaStateHook["isLogLoaded"];
     selectedDate: Date;
 }
 
-export function DayLog({ updateLog, getLog, selectedDate }: DayLogProps) {
+export function DayLog({ updateLog, getLog, isLogLoaded, selectedDate }: DayLogProps) {
     const isToday = formatDate(selectedDate) === formatDate(new Date());
 
     return (
@@ -35,6 +36,7 @@ export function DayLog({ updateLog, getLog, selectedDate }: DayLogProps) {
                     date={selectedDate}
                     isToday={isToday}
                     value={getLog(selectedDate)}
+                    loaded={isLogLoaded(selectedDate)}
                     onChange={(text) => updateLog(selectedDate, text)}
                 />
             </div>
@@ -47,12 +49,19 @@ interface DayLogEntryProps {
     date: Date;
     isToday: boolean;
     value: string;
+    // False while value is only the list preview; the entry is read-only until then
+    loaded: boolean;
     onChange: (text: string) => void;
 }
 
-function DayLogEntry({ date, isToday, value, onChange }: DayLogEntryProps) {
+function DayLogEntry({ date, isToday, value, loaded, onChange }: DayLogEntryProps) {
     const [localValue, setLocalValue] = useState(value);
 
+    // Pick up the full text once it replaces the list preview
+    useEffect(() => {
+        setLocalValue(value);
+    }, [value]);
+
     // Format date as "Mon 15"
     const displayDate = date.toLocaleDateString("en-US", {
         weekday: "short",
@@ -61,7 +70,7 @@ function DayLogEntry({ date, isToday, value, onChange }: DayLogEntryProps) {
 
     // Save on blur
     const handleBlur = () => {
-        if (localValue !== value) {
+        if (loaded && localValue !== value) {
             onChange(localValue);
         }
     };
@@ -79,8 +88,9 @@ function DayLogEntry({ date, isToday, value, onChange }: DayLogEntryProps) {
             {/* Text input */}
             <input
                 type="text"
-                placeholder="How was your day?"
+                placeholder={loaded ? "How was your day?" : "Loading…"}
                 value={localValue}
+                readOnly={!loaded}
                 onChange={(e) => setLocalValue(e.target.value)}
                 onBlur={handleBlur}
                 className={`flex-1 w-full rounded-lg border-0 bg-gray-50 px-3 py-2 text-sm focus:bg-white focus:ring-2 transition-colors focus:outline-none ${isToday ? "ring-1 ring-purple-200 focus:ring-purple-400" : ""
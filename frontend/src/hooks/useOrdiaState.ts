@@ -1,12 +1,30 @@
-import { useState, useEffect, useCallback } from "react";
+import { useState, useEffect, useCallback, useRef } from "react";
 import type { OrdiaaState, Habit, TodoItem, TodoPriority, TodoStatus } from "@/lib/types";
 import { loadState, saveState, formatDate } from "@/lib/storage";
 import { api } from "@/lib/api";
 
+// Mirrors make_preview in backend/app/models/daily_log.py
+const PREVIEW_LENGTH = 160;
+
+function previewOf(text: string): string {
+    return text.length <= PREVIEW_LENGTH ? text : text.slice(0, PREVIEW_LENGTH).trimEnd() + "…";
+}
+
 export function useOrdiaaState() {
     // Initialize state from localStorage initially
     const [state, setState] = useState<OrdiaaState>(loadState);
     const token = localStorage.getItem("ordia_token");
+    // The list endpoint only returns previews. Dates fetched in full or edited here
+    // never take a preview again; dates holding a server preview are read-only until
+    // their full text arrives. Text already saved in localStorage counts as full.
+    const fullLogDates = useRef<Set<string>>(new Set());
+    const previewLogDates = useRef<Set<string>>(new Set());
+    const [previewDates, setPreviewDates] = useState<Set<string>>(() => new Set());
+
+    const clearLogPreview = useCallback((dateStr: string) => {
+        previewLogDates.current.delete(dateStr);
+        setPreviewDates(new Set(previewLogDates.current));
+    }, []);
 
     // Fetch from backend when token is present
     useEffect(() => {
@@ -50,13 +68,25 @@ export function useOrdiaaState() {
                     });
                 });
 
-                const logs: Record<string, string> = {};
+                const previews: Record<string, string> = {};
                 logsData.forEach((l: any) => {
                     const dateStr = l.date.split('T')[0];
-                    logs[dateStr] = l.content;
+                    previews[dateStr] = l.preview ?? "";
                 });
 
-                setState({ habits, completions, todos, logs });
+                setState((prev) => {
+                    // Full text fetched, typed or saved locally wins over a matching preview
+                    const logs = { ...prev.logs };
+                    Object.entries(previews).forEach(([dateStr, preview]) => {
+                        if (fullLogDates.current.has(dateStr)) return;
+                        if (logs[dateStr] !== undefined && previewOf(logs[dateStr]) === preview) return;
+                        logs[dateStr] = preview;
+                        previewLogDates.current.add(dateStr);
+                    });
+                    return { habits, completions, todos, logs };
+                });
+                // Runs after the updater above: React processes hook queues in declaration order
+                setPreviewDates(() => new Set(previewLogDates.current));
             } catch (err) {
                 console.error("Failed to sync with backend:", err);
             }
@@ -65,10 +95,21 @@ export function useOrdiaaState() {
         syncWithBackend();
     }, [token]);
 
-    // Save to localStorage whenever state changes (fallback persistence)
+    // Save to localStorage whenever state changes (fallback persistence).
+    // Logs still holding a preview keep their previously saved full text.
     useEffect(() => {
-        saveState(state);
-    }, [state]);
+        if (previewLogDates.current.size === 0) {
+            saveState(state);
+            return;
+        }
+        const saved = loadState().logs;
+        const logs = { ...state.logs };
+        previewLogDates.current.forEach((dateStr) => {
+            if (saved[dateStr] !== undefined) logs[dateStr] = saved[dateStr];
+            else delete logs[dateStr];
+        });
+        saveState({ ...state, logs });
+    }, [state, previewDates]);
 
     // Toggle a habit's completion
     const toggleHabit = useCallback(async (habitId: string, date: Date) => {
@@ -94,8 +135,35 @@ export function useOrdiaaState() {
         }
     }, [token]);
 
+    // Replace a date's preview with its full text before it can be edited
+    const loadLog = useCallback(async (date: Date) => {
+        const dateStr = formatDate(date);
+        if (!token || fullLogDates.current.has(dateStr)) return;
+        try {
+            const log = await api.getLogByDate(dateStr);
+            // A concurrent request or a local edit may have landed first
+            if (fullLogDates.current.has(dateStr)) return;
+            fullLogDates.current.add(dateStr);
+            // No entry on the server: keep any text written locally
+            if (log) {
+                setState((prev) => ({
+                    ...prev,
+                    logs: { ...prev.logs, [dateStr]: log.content },
+                }));
+            }
+            clearLogPreview(dateStr);
+        } catch (err) {
+            // Offline or signed out: keep working on the local copy; a date that only
+            // holds a server preview stays read-only and is retried when selected again
+            console.error("Failed to load log from backend", err);
+        }
+    }, [token, clearLogPreview]);
+
     const updateLog = useCallback(async (date: Date, text: string) => {
         const dateStr = formatDate(date);
+        // Never send a preview back: it would replace the full entry on the server
+        if (previewLogDates.current.has(dateStr)) return;
+        fullLogDates.current.add(dateStr);
         setState((prev) => ({
             ...prev,
             logs: { ...prev.logs, [dateStr]: text },
@@ -117,6 +185,12 @@ export function useOrdiaaState() {
         [state.logs]
     );
 
+    // Whether a date's log holds its full text (not a server preview) and may be edited
+    const isLogLoaded = useCallback(
+        (date: Date): boolean => !previewDates.has(formatDate(date)),
+        [previewDates]
+    );
+
     const getTodos = useCallback(
         (date: Date): TodoItem[] => {
             return state.todos[formatDate(date)] || [];
@@ -328,7 +402,9 @@ export function useOrdiaaState() {
             return state.completions[key] ?? false;
         },
         updateLog,
+        loadLog,
         getLog,
+        isLogLoaded,
         getTodos,
         addTodo,
         toggleTodo,